@@ -0,0 +1,116 @@
+"""Compares name suggestions from the trigram index against pg_trgm.
+
+Run from the repository root with ``python -m benchmarks.fuzzy``.
+The database half needs a config.py with a dsn and a populated world schema.
+"""
+
+import time
+import random
+import asyncio
+import statistics
+
+import asyncpg
+
+import mhw
+
+
+TABLES = ('skills', 'armors', 'charms', 'decorations')
+
+
+def make_typo(name, rng):
+    chars = list(name)
+    index = rng.randrange(len(chars) - 1)
+    kind = rng.choice(('drop', 'swap', 'replace'))
+    if kind == 'drop':
+        del chars[index]
+    elif kind == 'swap':
+        chars[index], chars[index + 1] = chars[index + 1], chars[index]
+    else:
+        chars[index] = rng.choice('abcdefghijklmnopqrstuvwxyz')
+
+    return ''.join(chars).lower()
+
+
+def make_queries(data, count, seed=0):
+    rng = random.Random(seed)
+    names = {
+        'skills': [skill.name for skill in data.skills.values()],
+        'armors': [armor.name for armor in data.armors.values()],
+        'charms': [charm.name for charms in data.charms.values() for charm in charms],
+        'decorations': [decoration.name for decoration in data.decorations.values()],
+    }
+
+    queries = []
+    for _ in range(count):
+        table = rng.choice(TABLES)
+        name = rng.choice(names[table])
+        queries.append((table, name, make_typo(name, rng)))
+
+    return queries
+
+
+def report(label, timings, results, queries, limit):
+    top1 = sum(bool(found) and found[0] == name for found, (_, name, _) in zip(results, queries))
+    recall = sum(name in found for found, (_, name, _) in zip(results, queries))
+    timings = sorted(timings)
+    print(f'{label:<8} mean {statistics.mean(timings) * 1e6:>9.1f}us  '
+          f'p50 {timings[len(timings) // 2] * 1e6:>9.1f}us  '
+          f'p95 {timings[int(len(timings) * 0.95)] * 1e6:>9.1f}us  '
+          f'top-1 {top1 / len(queries):>6.1%}  recall@{limit} {recall / len(queries):>6.1%}')
+
+
+async def run_pg(queries, limit):
+    import config
+
+    pool = await asyncpg.create_pool(config.dsn)
+    timings = []
+    results = []
+    async with pool.acquire() as con:
+        for table, _, query in queries:
+            sql = f"""
+                  SELECT name
+                  FROM world.{table}
+                  WHERE name % $1
+                  ORDER BY SIMILARITY(name, $1) DESC
+                  LIMIT $2;
+                  """
+            start = time.perf_counter()
+            records = await con.fetch(sql, query, limit)
+            timings.append(time.perf_counter() - start)
+            results.append([name for name, in records])
+
+    await pool.close()
+    return timings, results
+
+
+def main(count=2000, limit=5):
+    start = time.perf_counter()
+    data = mhw.Snapshot.from_files()
+    print(f'Built snapshot and indexes in {(time.perf_counter() - start) * 1000:.2f}ms')
+
+    queries = make_queries(data, count)
+
+    timings = []
+    results = []
+    for table, _, query in queries:
+        start = time.perf_counter()
+        found = data.fuzzy[table].search(query, limit=limit)
+        timings.append(time.perf_counter() - start)
+        results.append([name for name, _ in found])
+
+    report('index', timings, results, queries, limit)
+
+    try:
+        pg_timings, pg_results = asyncio.get_event_loop().run_until_complete(run_pg(queries, limit))
+    except Exception as e:
+        print(f'Skipping pg_trgm: {type(e).__name__}: {e}')
+        return
+
+    report('pg_trgm', pg_timings, pg_results, queries, limit)
+
+    agreement = sum(a == b for a, b in zip(results, pg_results))
+    print(f'Identical suggestions for {agreement / len(queries):.1%} of queries')
+
+
+if __name__ == '__main__':
+    main()
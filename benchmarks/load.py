@@ -0,0 +1,277 @@
+"""Replays a mix of World commands through the bot without a Discord connection.
+
+Run from the repository root with ``python -m benchmarks.load``, see
+``--help`` for the options. Messages are handed to Bot.process_commands
+and everything they send goes through discord's Messageable.send into a
+fake HTTP client, which answers after --latency milliseconds.
+
+With --db the World data is loaded from the database in config.dsn
+instead of the data files. Before replaying, help is run once to check
+that listing commands takes no rate limit tokens.
+"""
+
+import time
+import random
+import asyncio
+import argparse
+import itertools
+import collections
+
+import discord
+
+import mhw
+import utils
+import launcher
+from bot import Bot
+from cogs.world import World
+
+
+ids = itertools.count(1)
+
+
+class FakeHTTP:
+    """Stands in for discord's HTTPClient, recording the requests made."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.requests = collections.Counter()
+
+    async def request(self, route, data):
+        self.requests[route] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        return data
+
+    async def send_message(self, channel_id, content, *, embed=None, **kwargs):
+        return await self.request('send_message', {
+            'id': next(ids),
+            'channel_id': channel_id,
+            'content': content or '',
+            'embeds': [embed] if embed else [],
+        })
+
+    async def edit_message(self, message_id, channel_id, **fields):
+        return await self.request('edit_message', dict(fields, id=message_id, channel_id=channel_id))
+
+    async def add_reaction(self, message_id, channel_id, emoji):
+        await self.request('add_reaction', None)
+
+    async def remove_reaction(self, message_id, channel_id, emoji, member_id):
+        await self.request('remove_reaction', None)
+
+    async def send_typing(self, channel_id):
+        await self.request('send_typing', None)
+
+
+class FakeState:
+    allowed_mentions = None
+
+    def __init__(self, http):
+        self.http = http
+        self.loop = asyncio.get_event_loop()
+
+    def create_message(self, *, channel, data):
+        return FakeMessage(self, channel, data['content'], author=None, id=data['id'])
+
+
+class FakeUser(discord.abc.Messageable):
+    def __init__(self, id, *, bot=False, state=None):
+        self._state = state
+        self.id = id
+        self.bot = bot
+        self.name = f'user{id}'
+        self.mention = f'<@{id}>'
+
+    async def _get_channel(self):
+        return FakeChannel(self._state, self.id)
+
+
+class FakeChannel(discord.abc.Messageable):
+    def __init__(self, state, id):
+        self._state = state
+        self.id = id
+        self.guild = None
+
+    async def _get_channel(self):
+        return self
+
+
+class FakeMessage:
+    def __init__(self, state, channel, content, *, author, id=None):
+        self._state = state
+        self.id = next(ids) if id is None else id
+        self.channel = channel
+        self.content = content
+        self.author = author
+        self.guild = None
+        self.mentions = []
+        self.role_mentions = []
+        self.channel_mentions = []
+
+    async def edit(self, **fields):
+        await self._state.http.edit_message(self.id, self.channel.id, **fields)
+
+    async def add_reaction(self, emoji):
+        await self._state.http.add_reaction(self.id, self.channel.id, emoji)
+
+    async def remove_reaction(self, emoji, member):
+        await self._state.http.remove_reaction(self.id, self.channel.id, emoji, member.id)
+
+    async def clear_reactions(self):
+        await self._state.http.request('clear_reactions', None)
+
+
+def make_mix(data, count, seed=0):
+    """Builds count command messages, weighted roughly like real usage, including misspelled names."""
+
+    rng = random.Random(seed)
+    skills = [skill.name for skill in data.skills.values()]
+    armors = [armor.name for armor in data.armors.values()]
+    charms = [levels[-1].name for levels in data.charms.values()]
+    decorations = [decoration.name for decoration in data.decorations.values()]
+    weapons = list(World.weapon_aliases)
+
+    def typo(name):
+        index = rng.randrange(len(name))
+        return name[:index] + name[index + 1:]
+
+    def armor_search():
+        options = [f'--skill "{rng.choice(skills)}"', f'--part {rng.choice(mhw.PARTS)}',
+                   f'--rarity {rng.randint(1, 8)}', f'--slots {rng.randint(1, 3)}', '--res fire>=1']
+        return 'armor search ' + ' '.join(rng.sample(options, rng.randint(1, 3)))
+
+    def misspelled():
+        command, names = rng.choice((('skill', skills), ('armor', armors)))
+        return f'{command} {typo(rng.choice(names))}'
+
+    commands = [
+        (20, lambda: f'skill {rng.choice(skills)}'),
+        (20, lambda: f'armor {rng.choice(armors)}'),
+        (15, lambda: f'charm {rng.choice(charms)}'),
+        (15, lambda: f'deco {rng.choice(decorations)}'),
+        (10, lambda: f'mv {rng.choice(weapons)}'),
+        (10, armor_search),
+        (10, misspelled),
+    ]
+
+    weights = [weight for weight, _ in commands]
+    return [f'mhw!{rng.choices(commands, weights)[0][1]()}' for _ in range(count)]
+
+
+def percentile(timings, percent):
+    return timings[min(len(timings) - 1, int(len(timings) * percent / 100))]
+
+
+async def run(bot, messages, concurrency):
+    timings = collections.defaultdict(list)
+    queue = collections.deque(messages)
+
+    async def worker():
+        while queue:
+            message = queue.popleft()
+            start = time.perf_counter()
+            await bot.process_commands(message)
+            timings[message.content[4:].split()[0]].append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return timings, time.perf_counter() - start
+
+
+def report(timings, elapsed):
+    def ms(seconds):
+        return f'{seconds * 1000:.2f}'
+
+    table = utils.TabularData()
+    table.set_columns(['Command', 'Count', 'p50', 'p95', 'p99', 'Max'])
+    everything = sorted(itertools.chain.from_iterable(timings.values()))
+    for command, values in sorted(timings.items()) + [('all', everything)]:
+        values = sorted(values)
+        table.add_row([command, len(values), ms(percentile(values, 50)), ms(percentile(values, 95)),
+                       ms(percentile(values, 99)), ms(values[-1])])
+
+    print(table.render())
+    print(f'{len(everything)} commands in {elapsed:.2f}s, {len(everything) / elapsed:.0f} commands/sec '
+          f'(latencies in milliseconds)')
+
+
+async def check_help(bot, state, channel, author):
+    """Runs help with the default limits, which should take no tokens since it doesn't invoke the commands it lists."""
+
+    limiter, bot.limiter = bot.limiter, utils.RateLimiter()
+    try:
+        await bot.process_commands(FakeMessage(state, channel, 'mhw!help', author=author))
+        if bot.limiter.buckets:
+            raise RuntimeError(f'help took rate limit tokens from {", ".join(map(str, bot.limiter.buckets))}')
+    finally:
+        bot.limiter = limiter
+
+    print('help took no rate limit tokens')
+
+
+async def benchmark(bot, args):
+    world = bot.get_cog('World')
+    await world.loaded.wait()
+    if bot.pool is not None:
+        await world.refresh(bot.pool)
+
+    http = FakeHTTP(args.latency / 1000)
+    state = FakeState(http)
+    channels = [FakeChannel(state, next(ids)) for _ in range(args.channels)]
+    authors = [FakeUser(next(ids), state=state) for _ in range(args.users)]
+
+    await check_help(bot, state, channels[0], authors[0])
+
+    rng = random.Random(args.seed)
+    messages = [FakeMessage(state, rng.choice(channels), content, author=rng.choice(authors))
+                for content in make_mix(world.data, args.count, args.seed)]
+
+    # A short warm up so the first commands do not pay for imports and first time setup.
+    await run(bot, messages[:args.concurrency], args.concurrency)
+    bot.stats = utils.Stats()
+    http.requests.clear()
+
+    timings, elapsed = await run(bot, messages, args.concurrency)
+    report(timings, elapsed)
+    print(', '.join(f'{count} {route}' for route, count in http.requests.most_common()))
+
+    for counter in ('errors', 'throttled'):
+        count = sum(stats.counters[counter] for stats in bot.stats.commands.values())
+        if count:
+            print(f'{count} commands {counter}.')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=5000, help='Number of commands to replay.')
+    parser.add_argument('--concurrency', type=int, default=50, help='Number of commands in flight at once.')
+    parser.add_argument('--latency', type=float, default=0.0, help='Simulated HTTP latency in milliseconds.')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--channels', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--db', action='store_true', help='Load the World data from the database.')
+    parser.add_argument('--rate-limit', action='store_true', help='Keep the per user, channel and guild limits.')
+    args = parser.parse_args()
+
+    loop = asyncio.get_event_loop()
+    pool = launcher.create_pool(loop) if args.db else None
+    bot = Bot(pool=pool, loop=loop)
+    bot._connection.user = FakeUser(0, bot=True)
+    if not args.rate_limit:
+        bot.limiter = utils.RateLimiter({})
+
+    try:
+        loop.run_until_complete(benchmark(bot, args))
+
+        # Paginated replies keep waiting for reactions that never come.
+        for task in asyncio.Task.all_tasks(loop):
+            task.cancel()
+    finally:
+        bot.executor.shutdown(wait=False)
+        if pool is not None:
+            loop.run_until_complete(pool.close())
+
+
+if __name__ == '__main__':
+    main()
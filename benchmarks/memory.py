@@ -0,0 +1,66 @@
+"""Compares the memory held by the raw json data with the in-memory models.
+
+Run from the repository root with ``python -m benchmarks.memory``.
+
+raw is the result of json.load on the data files, rows are the parsed
+table rows and models are the interned named tuples kept by the Snapshot,
+without its search indexes.
+"""
+
+import gc
+import json
+import tracemalloc
+
+import mhw
+
+
+def measure(func):
+    """Returns the result of func and the size in bytes of what it allocated and kept alive."""
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func()
+        gc.collect()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return result, size
+
+
+def load_raw():
+    data = {}
+    for _, filename, _, _ in mhw.ENTITIES:
+        data[filename] = json.loads(mhw.tables.read_data('mhw', filename))
+
+    return data
+
+
+def load_models():
+    snapshot = mhw.Snapshot.from_files()
+    return snapshot.skills, snapshot.items, snapshot.armors, snapshot.charms, snapshot.decorations, \
+        snapshot.weapons
+
+
+def load_raw_motion_values():
+    with open('mhw/motionvalues.json') as f:
+        return json.load(f)
+
+
+def main():
+    results = [
+        ('raw', load_raw),
+        ('rows', mhw.load_tables),
+        ('models', load_models),
+        ('raw motion values', load_raw_motion_values),
+        ('motion values', mhw.load_motion_values),
+    ]
+
+    for label, func in results:
+        _, size = measure(func)
+        print(f'{label:<18} {size / 1024:>10.1f}KiB')
+
+
+if __name__ == '__main__':
+    main()
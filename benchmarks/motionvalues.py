@@ -0,0 +1,32 @@
+"""Measures the per-call cost of the mv command's rendering.
+
+Run from the repository root with ``python -m benchmarks.motionvalues``.
+"""
+
+import timeit
+
+from cogs.world import World, load_files, render_motion_values
+
+
+def main(number=200):
+    start = timeit.default_timer()
+    _, motion_values, pages = load_files()
+    print(f'Data load {(timeit.default_timer() - start) * 1000:.2f}ms')
+
+    aliases = list(World.weapon_aliases.items())
+
+    def render():
+        for _, weapon in aliases:
+            render_motion_values(motion_values[weapon])
+
+    def lookup():
+        for alias, _ in aliases:
+            pages[World.weapon_aliases[alias]]
+
+    for label, func in (('render', render), ('lookup', lookup)):
+        elapsed = min(timeit.repeat(func, number=number, repeat=5))
+        print(f'{label:<7} {elapsed / (number * len(aliases)) * 1e6:>10.2f}us per call')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""Compares resolving charm and decoration names with the name trie against regexes and ILIKE.
+
+Run from the repository root with ``python -m benchmarks.names``.
+The database half needs a config.py with a dsn and a populated world schema.
+"""
+
+import re
+import time
+import random
+import asyncio
+import statistics
+
+import asyncpg
+
+import mhw
+
+
+# The patterns the charm and decoration commands parsed names with before the trie.
+charm_re = re.compile(r"(?P<name>[\w' ]+?(?= Charm| [\dI]+)|[\w' ]+)( )?(?(2)(Charm))( )?(?(4)(?P<level>[\dI]+))",
+                      re.IGNORECASE)
+deco_re = re.compile(r"(?P<name>[\w' ]+?(?= Jewel| [\dI]+)|[\w' ]+)( )?(?(2)(Jewel))( )?(?(4)(?P<level>[\dI]+))",
+                     re.IGNORECASE)
+
+TABLES = {
+    'charms': (charm_re, 'Charm'),
+    'decorations': (deco_re, 'Jewel'),
+}
+
+
+def make_inputs(data, count, seed=0):
+    """Returns (table, key, input) tuples with the ways people type names: in full, lowercase, without suffix or level."""
+
+    rng = random.Random(seed)
+    names = [('charms', key, charm.name, index) for key, charms in data.charms.items()
+             for index, charm in enumerate(charms, 1)]
+    names += [('decorations', key, decoration.name, decoration.slot_level)
+              for key, decoration in data.decorations.items()]
+
+    inputs = []
+    for _ in range(count):
+        table, key, name, level = rng.choice(names)
+        text = rng.choice((name, name.lower(), key, f'{key} {level}'))
+        inputs.append((table, key, text))
+
+    return inputs
+
+
+def report(label, timings, found, inputs):
+    timings = sorted(timings)
+    correct = sum(key == expected for key, (_, expected, _) in zip(found, inputs))
+    print(f'{label:<6} mean {statistics.mean(timings) * 1e6:>8.2f}us  '
+          f'p50 {timings[len(timings) // 2] * 1e6:>8.2f}us  '
+          f'p95 {timings[int(len(timings) * 0.95)] * 1e6:>8.2f}us  '
+          f'resolved {correct / len(inputs):>6.1%}')
+
+
+def run_regex(data, inputs):
+    timings, found = [], []
+    for table, _, text in inputs:
+        start = time.perf_counter()
+        match = TABLES[table][0].match(text.lower())
+        key = match.group('name') if match is not None else None
+        key = key if key in getattr(data, table) else None
+        timings.append(time.perf_counter() - start)
+        found.append(key)
+
+    return timings, found
+
+
+def run_trie(data, inputs):
+    timings, found = [], []
+    for table, _, text in inputs:
+        start = time.perf_counter()
+        resolved = data.names.resolve(text, (table,))
+        timings.append(time.perf_counter() - start)
+        found.append(resolved[1] if resolved is not None else None)
+
+    return timings, found
+
+
+async def run_pg(inputs):
+    import config
+
+    pool = await asyncpg.create_pool(config.dsn)
+    timings, found = [], []
+    async with pool.acquire() as con:
+        for table, _, text in inputs:
+            regex, suffix = TABLES[table]
+            start = time.perf_counter()
+            match = regex.match(text)
+            name = await con.fetchval(f"SELECT name FROM world.{table} WHERE name ILIKE $1 || ' {suffix}%' LIMIT 1;",
+                                      match.group('name'))
+            timings.append(time.perf_counter() - start)
+            found.append(mhw.snapshot.base_name(name, suffix.lower()) if name is not None else None)
+
+    await pool.close()
+    return timings, found
+
+
+def main(count=20000):
+    data = mhw.Snapshot.from_files()
+    inputs = make_inputs(data, count)
+
+    report('regex', *run_regex(data, inputs), inputs)
+    report('trie', *run_trie(data, inputs), inputs)
+
+    start = time.perf_counter()
+    for table, key, _ in inputs[:1000]:
+        data.names.complete(key[:3], (table,))
+    print(f'Completed 1000 three letter prefixes in {(time.perf_counter() - start) * 1000:.2f}ms')
+
+    try:
+        timings, found = asyncio.get_event_loop().run_until_complete(run_pg(inputs[:2000]))
+    except Exception as e:
+        print(f'Skipping ILIKE: {type(e).__name__}: {e}')
+        return
+
+    report('ILIKE', timings, found, inputs[:2000])
+
+
+if __name__ == '__main__':
+    main()
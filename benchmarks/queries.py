@@ -0,0 +1,54 @@
+"""Measures cold and warm latency of the registered World queries.
+
+Run from the repository root with ``python -m benchmarks.queries``.
+Needs a config.py with a dsn and a populated world schema.
+
+cold is a query on a connection without a statement cache, so it is
+parsed and planned every time. first is the first run on a fresh
+connection with asyncpg's statement cache, warm is the registry's query
+executed from the statement the pool init hook prepares.
+"""
+
+import time
+import asyncio
+import statistics
+
+import asyncpg
+
+import config
+import mhw
+
+
+async def timed(func, number):
+    timings = []
+    for _ in range(number):
+        start = time.perf_counter()
+        await func()
+        timings.append(time.perf_counter() - start)
+
+    return statistics.median(timings)
+
+
+async def main(number=50):
+    cold = await asyncpg.connect(config.dsn, statement_cache_size=0)
+    warm = await asyncpg.connect(config.dsn)
+    await mhw.queries.prepare(warm)
+
+    print(f'{"query":<28} {"cold":>10} {"first":>10} {"warm":>10}')
+    for name, query in mhw.queries.queries.items():
+        fresh = await asyncpg.connect(config.dsn)
+        start = time.perf_counter()
+        await fresh.fetch(query)
+        first = time.perf_counter() - start
+        await fresh.close()
+
+        cold_time = await timed(lambda: cold.fetch(query), number)
+        warm_time = await timed(lambda: mhw.queries.fetch(warm, name), number)
+        print(f'{name:<28} {cold_time * 1000:>8.3f}ms {first * 1000:>8.3f}ms {warm_time * 1000:>8.3f}ms')
+
+    await cold.close()
+    await warm.close()
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main())
@@ -0,0 +1,48 @@
+"""Measures TabularData rendering on a synthetic 10k row table.
+
+Run from the repository root with ``python -m benchmarks.tabular``.
+"""
+
+import random
+import timeit
+
+from discord.ext import commands
+
+import utils
+
+
+def make_table(rows, seed=0):
+    rng = random.Random(seed)
+    table = utils.TabularData()
+    table.set_columns(['Move', 'Damage Type', 'Motion Value/Stun/Exhaust'])
+    table.add_rows((f'Move {i} Lv {rng.randint(1, 4)}', rng.choice(('Sever', 'Blunt', 'Shot')),
+                    f'{rng.randint(1, 300)}/{rng.randint(0, 30)}/{rng.randint(0, 30)}') for i in range(rows))
+    return table
+
+
+def paginator_pages(table):
+    paginator = commands.Paginator()
+    for line in table.render().split('\n'):
+        paginator.add_line(line)
+
+    return paginator.pages
+
+
+def main(rows=10000, number=5):
+    table = make_table(rows)
+
+    benchmarks = (
+        ('build', lambda: make_table(rows)),
+        ('render', table.render),
+        ('render + Paginator', lambda: paginator_pages(table)),
+        ('paginate', lambda: list(table.paginate())),
+        ('first page', lambda: next(table.paginate())),
+    )
+
+    for label, func in benchmarks:
+        elapsed = min(timeit.repeat(func, number=number, repeat=3)) / number
+        print(f'{label:<20} {elapsed * 1000:>9.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,11 @@
 import os
+import time
+import asyncio
 import inspect
+import itertools
 import traceback
 from pathlib import Path
+from contextlib import contextmanager
 
 import discord
 from discord.ext import commands
@@ -10,20 +14,41 @@ import config
 import utils
 
 
-class Bot(commands.Bot):
-    def __init__(self, *, pool, **kwargs):
+class Bot(commands.AutoShardedBot):
+    def __init__(self, *, pool, startup_timings=None, shard_count=None, shard_ids=None, worker=None, health=None,
+                 **kwargs):
         super().__init__(command_prefix='mhw!', case_insensitive=True,
-                          pm_help=None, game=discord.Game(name='mhw!help'))
+                          pm_help=None, game=discord.Game(name='mhw!help'),
+                          shard_count=shard_count, shard_ids=shard_ids)
 
         self.pool = pool
-
+        self.worker = worker
+        self.started = time.perf_counter()
+        self.startup_timings = list(startup_timings or ())
+        self.executor = utils.Executor(processes=getattr(config, 'process_workers', None),
+                                       threads=getattr(config, 'thread_workers', None))
+        self.stats = utils.Stats()
+        self.limiter = utils.RateLimiter(getattr(config, 'rate_limits', None))
+        self.repository = utils.Repository()
+        self.source_urls = {}
+
+        stats_file = getattr(config, 'stats_file', None)
+        if stats_file is not None:
+            if worker is not None:
+                root, ext = os.path.splitext(stats_file)
+                stats_file = f'{root}-{worker}{ext}'
+
+            self.loop.create_task(self.dump_stats(stats_file, getattr(config, 'stats_interval', 60)))
+
+        # Set when the bot runs as a worker of the launcher's supervisor.
+        if health is not None:
+            self.loop.create_task(self.report_health(health, getattr(config, 'health_interval', 30)))
+
+        # Extensions that are not needed to answer commands are loaded once the bot is ready.
+        deferred = getattr(config, 'deferred_extensions', ('cogs.owner',))
         startup_extensions =  [f'cogs.{x.stem}' for x in Path('cogs').glob('*.py')]
-        for extension in startup_extensions:
-            try:
-                self.load_extension(extension)
-            except Exception as e:
-                print(f'Failed to load extension {extension}')
-                traceback.print_exc()
+        self.deferred_extensions = [extension for extension in startup_extensions if extension in deferred]
+        self.load_extensions(extension for extension in startup_extensions if extension not in deferred)
 
         self.add_command(self.invite)
         self.add_command(self.source)
@@ -32,12 +57,90 @@ class Bot(commands.Bot):
         print(f'Logged in as {self.user}')
         print('---------')
 
+        # on_ready is dispatched again after reconnects.
+        if self.deferred_extensions is None:
+            return
+
+        self.startup_timings.append(('ready', time.perf_counter() - self.started))
+        self.load_extensions(self.deferred_extensions)
+        self.deferred_extensions = None
+
+        with self.startup_phase('sources'):
+            self.refresh_sources()
+
+        print('Startup: ' + ', '.join(f'{phase} {seconds * 1000:.2f}ms' for phase, seconds in self.startup_timings))
+
+    @contextmanager
+    def startup_phase(self, phase):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.startup_timings.append((phase, time.perf_counter() - start))
+
+    def load_extensions(self, extensions):
+        for extension in extensions:
+            with self.startup_phase(extension):
+                try:
+                    self.load_extension(extension)
+                except Exception as e:
+                    print(f'Failed to load extension {extension}')
+                    traceback.print_exc()
+
+    async def close(self):
+        await super().close()
+        self.executor.shutdown(wait=False)
+
     async def on_message(self, message):
         if message.author.bot:
             return
 
         await self.process_commands(message)
 
+    async def get_context(self, message, *, cls=utils.Context):
+        return await super().get_context(message, cls=cls)
+
+    async def invoke(self, ctx):
+        if ctx.command is None:
+            return await super().invoke(ctx)
+
+        with ctx.timer('total'):
+            await super().invoke(ctx)
+
+    async def on_command_error(self, ctx, error):
+        if isinstance(error, utils.Throttled):
+            ctx.increment('throttled')
+            # Only the first rejection is answered so throttled spam does not turn into sends.
+            if error.first:
+                await ctx.send(f'{ctx.author.mention}, slow down, try again in {error.retry_after:.1f}s.')
+            return
+
+        if ctx.command is not None:
+            ctx.increment('errors')
+
+        await super().on_command_error(ctx, error)
+
+    async def report_health(self, health, interval):
+        while not self.is_closed():
+            ready = self.is_ready()
+            health.put({
+                'worker': self.worker,
+                'shards': self.shard_ids,
+                'ready': ready,
+                'guilds': len(self.guilds),
+                'latency': self.latency if ready else 0.0,
+                'commands': sum(stats.timings['total'].count for stats in self.stats.commands.values()
+                                if 'total' in stats.timings),
+                'time': time.time(),
+            })
+            await asyncio.sleep(interval)
+
+    async def dump_stats(self, path, interval):
+        await self.wait_until_ready()
+        while not self.is_closed():
+            await asyncio.sleep(interval)
+            self.stats.dump(path)
+
     @commands.command()
     async def invite(self, ctx):
         """Invite the bot to a server."""
@@ -48,6 +151,9 @@ class Bot(commands.Bot):
         permissions.read_messages = True
         permissions.send_messages = True
         permissions.embed_links = True
+        permissions.add_reactions = True
+        permissions.manage_messages = True
+        permissions.read_message_history = True
 
         invite = discord.utils.oauth_url(app_info.id, permissions=permissions)
         await ctx.send(invite)
@@ -56,28 +162,49 @@ class Bot(commands.Bot):
     async def source(self, ctx, *, command: utils.CommandConverter = None):
         """Posts the source code for the bot."""
 
-        source_url = await self.get_github_url()
+        if self.repository.url is None:
+            return await ctx.send('The source code location is unknown.')
 
         if command is None:
-            return await ctx.send(source_url)
+            return await ctx.send(self.repository.url)
 
         src = getattr(command, 'callback', command.__class__)
+        url = self.source_urls.get(src)
+        if url is None:
+            url = self.source_urls[src] = self.source_url(src)
+
+        await ctx.send(url)
+
+    def source_url(self, src):
+        """Returns the url of the lines a command callback or cog class is defined on."""
 
         lines, first_line = inspect.getsourcelines(src)
         last_line = first_line + len(lines) - 1
         module = src.__module__
         if not module.startswith('discord'):
             location = os.path.relpath(inspect.getfile(src))
-            branch, _ = await utils.run_subprocess('git rev-parse HEAD')
-            branch = branch.strip()
+            source_url, branch = self.repository.url, self.repository.commit
         else:
             location = f'{module.replace(".", "/")}.py'
             source_url = 'https://github.com/Rapptz/discord.py'
             branch = 'rewrite'
 
-        final_url = f'{source_url}/blob/{branch}/{location}#L{first_line}-L{last_line}'
-        await ctx.send(final_url)
+        return f'{source_url}/blob/{branch}/{location}#L{first_line}-L{last_line}'
 
-    async def get_github_url(self):
-        result, _ = await utils.run_subprocess('git remote get-url origin')
-        return result.strip()[:-4]
+    def refresh_sources(self):
+        """Rereads the repository from .git and precomputes the source url of every command and cog.
+
+        The urls are keyed on the callback or cog class, so commands of a reloaded extension never get stale ones.
+        """
+
+        self.repository.refresh()
+        self.source_urls = {}
+        if self.repository.url is None:
+            return
+
+        for obj in itertools.chain(self.walk_commands(), self.cogs.values()):
+            src = getattr(obj, 'callback', obj.__class__)
+            try:
+                self.source_urls[src] = self.source_url(src)
+            except (OSError, TypeError):
+                pass
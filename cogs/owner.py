@@ -53,6 +53,7 @@ class Owner:
         except Exception as e:
             await ctx.send(f'```py\n{type(e).__name__}: {e}\n```')
         else:
+            ctx.bot.refresh_sources()
             await ctx.send('\N{OK HAND SIGN}')
 
     @commands.command()
@@ -65,6 +66,7 @@ class Owner:
         except Exception as e:
             await ctx.send(f'```py\n{type(e).__name__}: {e}\n```')
         else:
+            ctx.bot.refresh_sources()
             await ctx.send('\N{OK HAND SIGN}')
 
     @commands.command()
@@ -78,8 +80,61 @@ class Owner:
         except Exception as e:
             await ctx.send(f'```py\n{type(e).__name__}: {e}\n```')
         else:
+            ctx.bot.refresh_sources()
             await ctx.send('\N{OK HAND SIGN}')
 
+    @commands.command()
+    async def refresh(self, ctx, source: str.lower = 'db'):
+        """Rebuilds the game data from the database or with `files` from the data files."""
+
+        world = ctx.bot.get_cog('World')
+        if world is None:
+            return await ctx.send('The World cog is not loaded.')
+
+        pool = None if source == 'files' else ctx.bot.pool
+        start = time.perf_counter()
+        try:
+            with ctx.timer('db' if pool else 'load'):
+                await world.refresh(pool)
+        except Exception as e:
+            await ctx.send(f'```py\n{type(e).__name__}: {e}\n```')
+        else:
+            await ctx.send(f'Refreshed {world.data} in {(time.perf_counter() - start) * 1000:.2f}ms.')
+
+    @commands.command()
+    async def stats(self, ctx):
+        """Shows latency, error and cache statistics per command."""
+
+        def ms(seconds):
+            return f'{seconds * 1000:.2f}'
+
+        table = utils.TabularData()
+        table.set_columns(['Command', 'Calls', 'Errors', 'Throttled', 'Coalesced', 'p50', 'p95', 'p99', 'Render', 'DB',
+                           'Send', 'Cache Hits'])
+        for command, stats in sorted(ctx.bot.stats.commands.items()):
+            total = stats.timings.get('total') or utils.Histogram()
+            average = {phase: ms(histogram.average) for phase, histogram in stats.timings.items()}
+            hits, misses = stats.counters['cache_hits'], stats.counters['cache_misses']
+            table.add_row([command, total.count, stats.counters['errors'], stats.counters['throttled'],
+                           stats.counters['coalesced'], ms(total.percentile(50)),
+                           ms(total.percentile(95)), ms(total.percentile(99)), average.get('render', '-'),
+                           average.get('db', '-'), average.get('send', '-'),
+                           f'{hits / (hits + misses):.0%}' if hits + misses else '-'])
+
+        for page in table.paginate():
+            await ctx.send(page)
+
+        pools = []
+        for kind, stats in ctx.bot.executor.stats.items():
+            stats = stats.to_dict()
+            pools.append(f'{kind}: {stats["pending"]} pending ({stats["queued"]} queued), '
+                         f'{stats["completed"]} completed, {stats["failed"]} failed, '
+                         f'{ms(stats["average_wait"])} average wait, {ms(stats["max_wait"])} max wait, '
+                         f'{ms(stats["average_run"])} average run')
+
+        startup = ', '.join(f'{phase} {ms(seconds)}' for phase, seconds in ctx.bot.startup_timings)
+        await ctx.send('Times are in milliseconds.\n' + '\n'.join(pools) + f'\nstartup: {startup}')
+
     @commands.command(name='eval')
     async def _eval(self, ctx, *, body: str):
         """Evaluates code."""
@@ -1,11 +1,17 @@
 import re
-import json
+import time
 import shlex
+import string
+import asyncio
 import argparse
+import traceback
+import collections
 
 import discord
 from discord.ext import commands
 
+import config
+import mhw
 import utils
 
 
@@ -14,167 +20,334 @@ class Arguments(argparse.ArgumentParser):
         raise RuntimeError(message)
 
 
+armor_parts = {part.lower(): part for part in mhw.PARTS}
+armor_parts.update(head='Helm', chest='Torso', body='Torso')
+
+resistance_re = re.compile(r'(?P<element>[a-z]+)\s*(?P<op>>=|<=|>|<|=)\s*(?P<value>-?\d+)')
+
+
+def armor_part(argument):
+    try:
+        return armor_parts[argument.lower()]
+    except KeyError:
+        raise argparse.ArgumentTypeError(f'Invalid part "{argument}", choose from {", ".join(mhw.PARTS)}.')
+
+
+def resistance(argument):
+    match = resistance_re.fullmatch(argument.lower())
+    if match is None or match.group('element') not in mhw.RESISTANCES:
+        raise argparse.ArgumentTypeError(f'Invalid resistance filter "{argument}", use e.g. fire>=2.')
+
+    return match.group('element'), match.group('op'), int(match.group('value'))
+
+
+def skill_level(argument, default=1):
+    name, _, level = argument.rpartition(' ')
+    if name and level.isdigit():
+        return name, int(level)
+
+    return argument, default
+
+
+def render_motion_values(weapon_values):
+    """Renders the motion values of a weapon into code block pages ready to be sent."""
+
+    table = utils.TabularData()
+    table.set_columns(['Move', 'Damage Type', 'Motion Value/Stun/Exhaust'])
+    for value in weapon_values:
+        table.add_row([value.move, value.damage_type, f'{value.motion_value}/{value.stun}/{value.exhaust}'])
+
+    # Leaves room for the page number added by utils.Pages.
+    return tuple(table.paginate(max_size=1980))
+
+
+def load_files(path='mhw'):
+    """Parses the data files into a snapshot, the motion values and their pages. Blocks, run it in a thread."""
+
+    data = mhw.Snapshot.from_files(path)
+    motion_values = mhw.load_motion_values(f'{path}/motionvalues.json')
+    pages = {weapon: render_motion_values(values) for weapon, values in motion_values.items()}
+    return data, motion_values, pages
+
+
 class World:
-    charm_re = re.compile(r"(?P<name>[\w' ]+?(?= Charm| [\dI]+)|[\w' ]+)( )?(?(2)(Charm))( )?(?(4)(?P<level>[\dI]+))", re.IGNORECASE)
-    deco_re = re.compile(r"(?P<name>[\w' ]+?(?= Jewel| [\dI]+)|[\w' ]+)( )?(?(2)(Jewel))( )?(?(4)(?P<level>[\dI]+))", re.IGNORECASE)
+    weapon_aliases = {
+        'gs': 'great sword',
+        'great sword': 'great sword',
+        'greatsword': 'great sword',
+        'ls': 'long sword',
+        'long sword': 'long sword',
+        'longsword': 'long sword',
+        'sns': 'sword and shield',
+        's&s': 'sword and shield',
+        'sword and shield': 'sword and shield',
+        'sword & shield': 'sword and shield',
+        'sword&shield': 'sword and shield',
+        'sword n shield': 'sword and shield',
+        'sword \'n\' shield': 'sword and shield',
+        'dbs': 'dual blades',
+        'db': 'dual blades',
+        'dual blades': 'dual blades',
+        'dualblades': 'dual blades',
+        'dual blade': 'dual blades',
+        'dualblade': 'dual blades',
+        'duals': 'dual blades',
+        'hammer': 'hammer',
+        'hh': 'hunting horn',
+        'horn': 'hunting horn',
+        'hunting horn': 'hunting horn',
+        'huntinghorn': 'hunting horn',
+        'lance': 'lance',
+        'gl': 'gunlance',
+        'gunlance': 'gunlance',
+        'gun lance': 'gunlance',
+        'sa': 'switch axe',
+        'axe': 'switch axe',
+        'switch axe': 'switch axe',
+        'switchaxe': 'switch axe',
+        'cb': 'charge blade',
+        'charge blade': 'charge blade',
+        'chargeblade': 'charge blade',
+        'ig': 'insect glaive',
+        'glaive': 'insect glaive',
+        'insect glaive': 'insect glaive',
+        'insectglaive': 'insect glaive',
+        'lbg': 'light bowgun',
+        'light bowgun': 'light bowgun',
+        'light bow gun': 'light bowgun',
+        'lightbow gun': 'light bowgun',
+        'lighbowgun': 'light bowgun',
+        'hbg': 'heavy bowgun',
+        'heavy bowgun': 'heavy bowgun',
+        'heavy bow gun': 'heavy bowgun',
+        'heavybow gun': 'heavy bowgun',
+        'heavybowgun': 'heavy bowgun',
+        'bow': 'bow',
+        'shot': 'shot',
+        'shots': 'shot',
+        'bullet': 'shot',
+        'bullets': 'shot',
+        'ammo': 'shot',
+        'ammos': 'shot'
+    }
+
+    def __init__(self, bot):
+        self.bot = bot
+
+        self.data = None
+        self.motion_values = {}
+        self.motion_value_pages = {}
+        self.movesets = {}
+        self.embeds = utils.LRUCache(1024, ttl=3600)
+        self.in_flight = utils.SingleFlight()
+
+        # The data files are parsed in a thread, commands wait for the first load.
+        self.loaded = asyncio.Event()
+        self.watcher = utils.FileWatcher('mhw/*.json')
+        self.watch_task = bot.loop.create_task(self.watch(getattr(config, 'watch_interval', 5.0)))
+
+    def __unload(self):
+        self.watch_task.cancel()
+
+    async def __local_check(self, ctx):
+        await self.loaded.wait()
+        return True
+
+    async def __before_invoke(self, ctx):
+        # Not a check, help runs the checks of every command it lists and would use up the buckets.
+        ctx.bot.limiter.acquire(ctx)
+
+    def swap(self, data, motion_values=None, pages=None):
+        self.data = data
+        if pages is not None:
+            self.motion_values = motion_values
+            self.motion_value_pages = {alias: pages[weapon] for alias, weapon in self.weapon_aliases.items()}
+            self.movesets = {weapon: mhw.make_moveset(values) for weapon, values in motion_values.items()}
+
+        self.embeds.clear()
+
+    async def refresh(self, pool=None):
+        """Rebuilds the game data from the database, or from the data files if no pool is given.
+
+        Concurrent refreshes from the same source share one load.
+        """
+
+        if pool is None:
+            self.swap(*await self.in_flight.do(('refresh', 'files'), self.bot.executor.run_in_thread, load_files))
+        else:
+            self.swap(await self.in_flight.do(('refresh', 'db'), mhw.Snapshot.from_pool, pool))
+
+    async def watch(self, interval):
+        """Loads the data files, then reloads them whenever one changes if interval is set."""
+
+        while not self.loaded.is_set():
+            try:
+                with self.bot.startup_phase('data'):
+                    await self.refresh()
+            except Exception:
+                print('Failed to load the data files')
+                traceback.print_exc()
+                await asyncio.sleep(interval or 5.0)
+            else:
+                self.loaded.set()
+
+        # A database sync that failed is retried on its own, with a growing delay, without parsing again.
+        sync_pending = False
+        sync_delay = retry_at = 0.0
+        while interval:
+            await asyncio.sleep(interval)
+            state, changed = self.watcher.changes()
+            if changed:
+                try:
+                    await self.reload(changed)
+                except Exception:
+                    # The files are retried on the next poll, they may have been caught halfway through a write.
+                    print(f'Failed to reload {", ".join(changed)}')
+                    traceback.print_exc()
+                    continue
+
+                self.watcher.commit(state)
+                if self.syncs_db():
+                    sync_pending, sync_delay, retry_at = True, interval, 0.0
+
+            if not sync_pending or time.monotonic() < retry_at:
+                continue
+
+            try:
+                await self.sync_db()
+            except Exception:
+                print(f'Failed to write the data files to the database, retrying in {sync_delay:.1f}s')
+                traceback.print_exc()
+                retry_at = time.monotonic() + sync_delay
+                sync_delay = min(sync_delay * 2, 300.0)
+            else:
+                sync_pending = False
+
+    def syncs_db(self):
+        """Whether reloaded files are written to the database by this process.
+
+        Under the launcher's supervisor every worker reloads the files but only
+        the first one writes them, the others would repeat the same update.
+        """
+
+        return self.bot.pool is not None and getattr(config, 'watch_sync_db', True) and self.bot.worker in (None, 0)
+
+    async def reload(self, changed):
+        """Parses the data files and swaps in the new data."""
+
+        start = time.perf_counter()
+        data = await self.in_flight.do(('refresh', 'files'), self.bot.executor.run_in_thread, load_files)
+        parsed = time.perf_counter()
+        self.swap(*data)
+        end = time.perf_counter()
+
+        for phase, seconds in (('parse', parsed - start), ('total', end - start)):
+            self.bot.stats.observe('reload', phase, seconds)
+
+        print(f'Reloaded {", ".join(changed)}: parse {(parsed - start) * 1000:.2f}ms, '
+              f'total {(end - start) * 1000:.2f}ms')
+
+    async def sync_db(self):
+        """Writes the changes in the data files to the database."""
+
+        start = time.perf_counter()
+        pool = self.bot.pool
+        state = await mhw.fetch_state(pool)
+        deltas = await self.bot.executor.run_in_thread(mhw.diff_entities, state)
+        if deltas:
+            await mhw.apply_deltas(pool, deltas)
+
+        elapsed = time.perf_counter() - start
+        self.bot.stats.observe('reload', 'db', elapsed)
+        print(f'Wrote {len(deltas)} changed data files to the database in {elapsed * 1000:.2f}ms')
+
+    def cached_embed(self, ctx, command, key, get_embed):
+        """Returns the cached embed of command for key, building it with get_embed on a miss.
+
+        get_embed is called with the normalized key and returns None if nothing was found.
+        """
 
-    def __init__(self):
-        with open('mhw/motionvalues.json') as f:
-            self.motion_values = json.load(f)
+        key = ' '.join(key.split())
+        embed = self.embeds.get((command, key))
+        if embed is None:
+            ctx.increment('cache_misses')
+            with ctx.timer('render'):
+                embed = get_embed(key)
+
+            if embed is not None:
+                self.embeds[command, key] = embed
+        else:
+            ctx.increment('cache_hits')
+
+        return embed
+
+    async def send_embed(self, ctx, key, get_embed):
+        """Sends the cached embed for key, returns whether one was found and sent."""
+
+        embed = self.cached_embed(ctx, ctx.command.qualified_name, key, get_embed)
+        if embed is None:
+            return False
+
+        await ctx.send(embed=embed)
+        return True
 
     @commands.command()
     async def charm(self, ctx, *, name: str.lower):
         """Shows information about Charms."""
 
-        match = self.charm_re.match(name)
-        name = match.group('name')
-
-        query = """
-                SELECT
-                    charms.name,
-                    STRING_AGG(DISTINCT skill || ' ' || level, ', ') AS skills,
-                    STRING_AGG(DISTINCT material || ' x' || amount, ', ') AS materials
-                FROM world.charms
-                JOIN world.charm_skills
-                ON charms.name = charm_skills.name
-                LEFT JOIN world.charm_materials
-                ON charms.name = charm_materials.name
-                WHERE charms.name ILIKE $1 || ' Charm%'
-                GROUP BY charms.name
-                ORDER BY charms.name;
-                """
-        records = await ctx.bot.pool.fetch(query, name)
-
-        if not records:
-            return await self.show_possibilities(ctx, 'charms', name)
+        resolved = self.data.names.resolve(name, ('charms',))
+        if resolved is None or not await self.send_embed(ctx, resolved[1], self.charm_embed):
+            await self.show_possibilities(ctx, 'charms', name)
+
+    def charm_embed(self, name):
+        charms = self.data.charms.get(name)
+
+        if not charms:
+            return None
 
         embed = discord.Embed(title=f'{name.title()} Charm')
 
-        skills = [f'{"I" * index} - {skills}' for index, (_, skills, _) in enumerate(records, 1)]
+        skills = [f'{"I" * index} - {", ".join(f"{skill} {level}" for skill, level in charm.skills)}'
+                  for index, charm in enumerate(charms, 1)]
         embed.add_field(name='Skills', value='\n'.join(skills))
 
-        if records[0]['materials'] is not None:
-            mats = [f'{"I" * index} - {materials}' for index, (*_, materials) in enumerate(records, 1)]
+        if charms[0].materials:
+            mats = [f'{"I" * index} - {", ".join(f"{material} x{amount}" for material, amount in charm.materials)}'
+                    for index, charm in enumerate(charms, 1)]
             embed.add_field(name='Materials', value='\n'.join(mats), inline=False)
 
-        await ctx.send(embed=embed)
+        return embed
 
     @commands.command()
     async def mv(self, ctx, *, weapon: str.lower):
         """Shows the motion values for weapons."""
 
-        transformations = {
-            'gs': 'great sword',
-            'great sword': 'great sword',
-            'greatsword': 'great sword',
-            'ls': 'long sword',
-            'long sword': 'long sword',
-            'longsword': 'long sword',
-            'sns': 'sword and shield',
-            's&s': 'sword and shield',
-            'sword and shield': 'sword and shield',
-            'sword & shield': 'sword and shield',
-            'sword&shield': 'sword and shield',
-            'sword n shield': 'sword and shield',
-            'sword \'n\' shield': 'sword and shield',
-            'dbs': 'dual blades',
-            'db': 'dual blades',
-            'dual blades': 'dual blades',
-            'dualblades': 'dual blades',
-            'dual blade': 'dual blades',
-            'dualblade': 'dual blades',
-            'duals': 'dual blades',
-            'hammer': 'hammer',
-            'hh': 'hunting horn',
-            'horn': 'hunting horn',
-            'hunting horn': 'hunting horn',
-            'huntinghorn': 'hunting horn',
-            'lance': 'lance',
-            'gl': 'gunlance',
-            'gunlance': 'gunlance',
-            'gun lance': 'gunlance',
-            'sa': 'switch axe',
-            'axe': 'switch axe',
-            'switch axe': 'switch axe',
-            'switchaxe': 'switch axe',
-            'cb': 'charge blade',
-            'charge blade': 'charge blade',
-            'chargeblade': 'charge blade',
-            'ig': 'insect glaive',
-            'glaive': 'insect glaive',
-            'insect glaive': 'insect glaive',
-            'insectglaive': 'insect glaive',
-            'lbg': 'light bowgun',
-            'light bowgun': 'light bowgun',
-            'light bow gun': 'light bowgun',
-            'lightbow gun': 'light bowgun',
-            'lighbowgun': 'light bowgun',
-            'hbg': 'heavy bowgun',
-            'heavy bowgun': 'heavy bowgun',
-            'heavy bow gun': 'heavy bowgun',
-            'heavybow gun': 'heavy bowgun',
-            'heavybowgun': 'heavy bowgun',
-            'bow': 'bow',
-            'shot': 'shot',
-            'shots': 'shot',
-            'bullet': 'shot',
-            'bullets': 'shot',
-            'ammo': 'shot',
-            'ammos': 'shot'
-        }
-
-        weapon = transformations.get(weapon)
-        if weapon is None:
+        pages = self.motion_value_pages.get(weapon)
+        if pages is None:
             return await ctx.send('Weapon not found.')
 
-        weapon_values = self.motion_values[weapon]
-
-        table = utils.TabularData()
-        table.set_columns(['Move', 'Damage Type', 'Motion Value/Stun/Exhaust'])
-        for move, data in weapon_values.items():
-            table.add_row([move, data['Damage Type'], f"{data['Motion Value']}/{data['Stun']}/{data['Exhaust']}"])
-
-        render = table.render()
-        paginator = commands.Paginator()
-        for line in render.split('\n'):
-            paginator.add_line(line)
-
-        for p in paginator.pages:
-            await ctx.send(p)
+        await utils.Pages(ctx, pages.__getitem__, len(pages)).send()
 
     @commands.command()
     async def skill(self, ctx, *, name: str.lower):
         """Shows information about skills."""
 
-        query = """
-                SELECT
-                    skills.name,
-                    description,
-                    STRING_AGG(DISTINCT 'Lv ' || skill_levels.level || ' - ' || effect, E'\n') AS levels,
-                    STRING_AGG(DISTINCT  armor_skills.name || ' - ' || armor_skills.level || ' points', E'\n') AS armors,
-                    STRING_AGG(DISTINCT  charm_skills.name || ' - ' || charm_skills.level || ' points', E'\n') AS charms,
-                    decorations.name AS decoration
-                FROM world.skills
-                LEFT JOIN world.skill_levels
-                ON skills.name = skill_levels.name
-                LEFT JOIN world.armor_skills
-                ON skills.name = armor_skills.skill
-                LEFT JOIN world.charm_skills
-                ON skills.name = charm_skills.skill
-                LEFT JOIN world.decorations
-                ON skills.name = decorations.skill
-                WHERE LOWER(skills.name)=$1
-                GROUP BY skills.name, decoration;
-                """
-        record = await ctx.bot.pool.fetchrow(query, name)
-
-        if record is None:
-            return await self.show_possibilities(ctx, 'skills', name)
-
-        name, description, levels, armors, charms, decoration = record
-
-        embed = discord.Embed(title=name)
-        embed.description = description
+        if not await self.send_embed(ctx, name, self.skill_embed):
+            await self.show_possibilities(ctx, 'skills', name)
+
+    def skill_embed(self, name):
+        skill = self.data.skills.get(name)
+
+        if skill is None:
+            return None
+
+        levels = '\n'.join(f'Lv {level} - {effect}' for level, effect in skill.levels)
+        armors = '\n'.join(f'{armor} - {level} points' for armor, level in skill.armors)
+        charms = '\n'.join(f'{charm} - {level} points' for charm, level in skill.charms)
+        decoration = skill.decoration
+
+        embed = discord.Embed(title=skill.name)
+        embed.description = skill.description
 
         if levels:
             embed.add_field(name='Levels', value=levels)
@@ -188,31 +361,25 @@ class World:
         if decoration:
             embed.add_field(name='Decoration', value=decoration)
 
-        await ctx.send(embed=embed)
+        return embed
 
     @commands.command(aliases=['deco'])
     async def decoration(self, ctx, *, name: str.lower):
         """Shows information about decorations."""
 
-        match = self.deco_re.match(name)
-
-        name = match.group('name')
+        resolved = self.data.names.resolve(name, ('decorations',))
+        if resolved is None or not await self.send_embed(ctx, resolved[1], self.decoration_embed):
+            await self.show_possibilities(ctx, 'decorations', name)
 
-        query = """
-                SELECT name, skill, rarity
-                FROM world.decorations
-                WHERE name ILIKE $1 || ' Jewel%';
-                """
-        record = await ctx.bot.pool.fetchrow(query, name)
+    def decoration_embed(self, name):
+        decoration = self.data.decorations.get(name)
 
-        if record is None:
-            return await self.show_possibilities(ctx, 'decorations', name)
+        if decoration is None:
+            return None
 
-        name, skill, rarity = record
-
-        embed = discord.Embed(title=name)
-        embed.add_field(name='Skill', value=skill)
-        embed.add_field(name='Rarity', value=rarity)
+        embed = discord.Embed(title=decoration.name)
+        embed.add_field(name='Skill', value=decoration.skill)
+        embed.add_field(name='Rarity', value=decoration.rarity)
 
         drop_rates = {
             5: 'Mysterious: 3.036%\nGlowing: 2.321%\nWorn: 0.357%\nWarped: 0%',
@@ -221,43 +388,25 @@ class World:
             8: 'Mysterious: 0%\nGlowing: 0%\nWorn: 0.167%\nWarped: 0.417%'
         }
 
-        embed.add_field(name='Drop Rates', value=drop_rates[rarity], inline=False)
+        embed.add_field(name='Drop Rates', value=drop_rates[decoration.rarity], inline=False)
 
-        await ctx.send(embed=embed)
+        return embed
 
     @commands.group(invoke_without_command=True, case_insensitive=True)
     async def armor(self, ctx, *, name: str.lower):
         """Shows information for armor."""
 
-        query = """
-                SELECT
-                    armors.name,
-                    rarity,
-                    price,
-                    part,
-                    min_def || '~' || max_def AS def,
-                    slot_levels,
-                    fire_res,
-                    water_res,
-                    thunder_res,
-                    ice_res,
-                    dragon_res,
-                    STRING_AGG(DISTINCT material || ' x' || amount, ', ') AS materials,
-                    STRING_AGG(DISTINCT skill || ' ' || level, ', ') AS skills
-                FROM world.armors
-                LEFT JOIN world.armor_materials
-                ON armors.name = armor_materials.name
-                LEFT JOIN world.armor_skills
-                ON armors.name = armor_skills.name
-                WHERE LOWER(armors.name) = $1
-                GROUP BY armors.name;
-                """
-
-        record = await ctx.bot.pool.fetchrow(query, name)
-        if record is None:
-            return await self.show_possibilities(ctx, 'armors', name)
-
-        name, rarity, price, part, defense, slots, fire_res, water_res, thunder_res, ice_res, dragon_res, mats, skills = record
+        resolved = self.data.names.resolve(name, ('armors',))
+        if resolved is not None:
+            name = resolved[1]
+
+        if not await self.send_embed(ctx, name, self.armor_embed):
+            await self.show_possibilities(ctx, 'armors', name)
+
+    def armor_embed(self, name):
+        armor = self.data.armors.get(name)
+        if armor is None:
+            return None
 
         e_def = '<:mhw_def:429038203832369172>'
         e_fire = '<:mhw_fire:429038203475853314>'
@@ -275,14 +424,16 @@ class World:
             3: e_wide3
         }
 
-        slots = ' '.join(filter(None, map(slot_transform.get, slots))) or 'None'
-        defenses = f'{e_def}: {defense}\n{e_fire}: {fire_res}\n{e_water}: {water_res}\n{e_thunder}: {thunder_res}' \
-                   f'\n{e_ice}: {ice_res}\n{e_dragon}: {dragon_res}'
+        slots = ' '.join(filter(None, map(slot_transform.get, armor.slot_levels))) or 'None'
+        defenses = f'{e_def}: {armor.min_def}~{armor.max_def}\n{e_fire}: {armor.fire_res}\n{e_water}: {armor.water_res}' \
+                   f'\n{e_thunder}: {armor.thunder_res}\n{e_ice}: {armor.ice_res}\n{e_dragon}: {armor.dragon_res}'
+        mats = ', '.join(f'{material} x{amount}' for material, amount in armor.materials)
+        skills = ', '.join(f'{skill} {level}' for skill, level in armor.skills)
 
-        embed = discord.Embed(title=name)
-        embed.add_field(name='Rarity', value=rarity)
-        embed.add_field(name='Price', value=price)
-        embed.add_field(name='Part', value=part)
+        embed = discord.Embed(title=armor.name)
+        embed.add_field(name='Rarity', value=armor.rarity)
+        embed.add_field(name='Price', value=armor.price)
+        embed.add_field(name='Part', value=armor.part)
         embed.add_field(name='Defenses', value=defenses, inline=False)
         embed.add_field(name='Slots', value=slots)
         if mats:
@@ -290,7 +441,7 @@ class World:
         if skills:
             embed.add_field(name='Skills', value=skills, inline=False)
 
-        await ctx.send(embed=embed)
+        return embed
 
     @armor.command(name='search')
     async def armor_search(self, ctx, *, args: str):
@@ -298,61 +449,330 @@ class World:
 
         Search options are chosen by doing --option value
         The following options are valid.
-        slots: The slots the armor should have,
-        part: The type of armor to search for.
+        slots: The minimum slot levels the armor should have.
+        part: The types of armor to search for.
+        rarity: The rarities of the armor.
+        min-def: The minimum base defense of the armor.
+        res: Resistance filters such as fire>=2 or dragon<0.
+        skill: A skill the armor should have, optionally followed by a minimum level. Can be repeated.
+        page: The page of results to start on.
         """
 
         parser = Arguments(add_help=False, allow_abbrev=False)
         parser.add_argument('--slots', type=int, nargs='+', choices=(0, 1, 2, 3))
-        parser.add_argument('--part', type=str, choices=('Head', 'Torso', 'Arms', 'Waist', 'Legs'))
+        parser.add_argument('--part', type=armor_part, nargs='+', default=())
+        parser.add_argument('--rarity', type=int, nargs='+', default=())
+        parser.add_argument('--min-def', type=int)
+        parser.add_argument('--res', type=resistance, nargs='+', default=())
+        parser.add_argument('--skill', type=skill_level, action='append', default=[])
+        parser.add_argument('--page', type=int, default=1)
 
         try:
             args = parser.parse_args(shlex.split(args))
         except Exception as e:
             return await ctx.send(e)
 
-        pred = ''
+        if args.slots and len(args.slots) > 3:
+            return await ctx.send('Slot amount may not be greater than 3.')
+
+        for skill, _ in args.skill:
+            if skill.lower() not in self.data.skills:
+                return await ctx.send(f'Skill "{skill}" not found.')
 
-        if args.slots:
-            if len(args.slots) > 3:
-                return await ctx.send('Slot amount may not be greater than 4.')
+        results = self.data.armor_index.search(parts=args.part, rarities=args.rarity, slots=args.slots or (),
+                                               min_def=args.min_def, resistances=args.res, skills=args.skill)
+        if not results:
+            return await ctx.send('No armor found.')
 
-            args.slots.extend([0, 0])
-            pred += f"""
-                    AND slot_levels[1] >= {args.slots[0]}
-                    AND slot_levels[2] >= {args.slots[1]}
-                    AND slot_levels[3] >= {args.slots[2]}
-                    """
+        per_page = 20
 
-        if args.part:
-            pred += f"""
-                    AND part = '{args.part}'
-                    """
+        def get_page(index):
+            lines = [f'{len(results)} results']
+            for armor in results[index * per_page:(index + 1) * per_page]:
+                lines.append(f'{armor.name} ({armor.part}, Rarity {armor.rarity}, {armor.min_def}~{armor.max_def} def)')
+            return '\n'.join(lines)
 
-        query = f"""
-                SELECT
-                    STRING_AGG(name, E'\n')
-                FROM world.armors
-                WHERE 1=1
-                {pred}
-                """
-        names = await ctx.bot.pool.fetchval(query)
+        pages = (len(results) - 1) // per_page + 1
+        await utils.Pages(ctx, get_page, pages, start=args.page - 1).send()
 
-        await ctx.send(names or 'No armor found.')
+    def resolve(self, name):
+        """Finds what a name refers to, returning the command showing it, its key and embed builder."""
+
+        resolved = self.data.names.resolve(name, ('armors', 'skills', 'charms', 'decorations'))
+        if resolved is None:
+            return None
+
+        kind, key, _ = resolved
+        return {
+            'armors': ('armor', key, self.armor_embed),
+            'skills': ('skill', key, self.skill_embed),
+            'charms': ('charm', key, self.charm_embed),
+            'decorations': ('decoration', key, self.decoration_embed),
+        }[kind]
+
+    @commands.command(aliases=['batch'])
+    async def lookup(self, ctx, *, names: str.lower):
+        """Looks up several armor pieces, skills, charms and decorations at once.
+
+        Names are separated by commas, e.g. kaiser crown beta, attack boost, attack charm iii, expert jewel.
+        Every result is a page of one message.
+        """
+
+        names = list(collections.OrderedDict.fromkeys(' '.join(name.split()) for name in names.split(',')))
+        names = [name for name in names if name]
+        if not names:
+            return await ctx.send('No names given.')
+
+        if len(names) > 25:
+            return await ctx.send('At most 25 names can be looked up at once.')
+
+        found, missing = [], []
+        for name in names:
+            resolved = self.resolve(name)
+            if resolved is None:
+                missing.append(name)
+            else:
+                found.append(resolved)
+
+        if found:
+            await utils.Pages(ctx, lambda index: self.cached_embed(ctx, *found[index]), len(found)).send()
+
+        if missing:
+            await ctx.send(f'Not found: {", ".join(missing)}')
+
+    @commands.command()
+    async def item(self, ctx, *, name: str.lower):
+        """Shows the armor and charms crafted with an item and how many of it they need."""
+
+        material = self.data.materials.get(' '.join(name.split()))
+        if material is None:
+            return await self.show_possibilities(ctx, 'items', name)
+
+        if not material.armors and not material.charms:
+            return await ctx.send(f'Nothing is crafted with {material.name}.')
+
+        table = utils.TabularData()
+        table.set_columns(['Type', 'Name', 'Amount'])
+        table.add_rows(['Armor', armor, amount] for armor, amount in material.armors)
+        table.add_rows(['Charm', charm, amount] for charm, amount in material.charms)
+
+        pages = tuple(table.paginate(max_size=1900))
+        await utils.Pages(ctx, lambda index: f'{material.name}\n{pages[index]}', len(pages)).send()
+
+    def gear_materials(self, name):
+        """Returns the materials needed for an armor piece or charm, or None if there is none by that name.
+
+        Charms are upgraded from the previous level, so they need the materials of every level up to theirs.
+        """
+
+        resolved = self.data.names.resolve(name, ('armors', 'charms'))
+        if resolved is None:
+            return None
+
+        kind, key, level = resolved
+        if kind == 'armors':
+            return self.data.armors[key].materials
+
+        levels = self.data.charms[key]
+        if level is not None and not 1 <= level <= len(levels):
+            return None
+
+        return [material for charm in levels[:level or 1] for material in charm.materials]
+
+    @commands.command()
+    async def cost(self, ctx, *, gear: str.lower):
+        """Totals the materials needed to craft armor pieces and charms.
+
+        Names are separated by commas, e.g. kaiser crown beta, kaiser vambraces beta, attack charm iii.
+        A charm without a level is its first level.
+        """
+
+        totals = collections.Counter()
+        missing = []
+        for name in filter(None, (' '.join(name.split()) for name in gear.split(','))):
+            materials = self.gear_materials(name)
+            if materials is None:
+                missing.append(name)
+                continue
+
+            for material, amount in materials:
+                totals[material] += amount
+
+        if missing:
+            return await ctx.send(f'Not found: {", ".join(missing)}')
+
+        if not totals:
+            return await ctx.send('No materials needed.')
+
+        table = utils.TabularData()
+        table.set_columns(['Material', 'Amount'])
+        table.add_rows(sorted(totals.items()))
+
+        pages = tuple(table.paginate(max_size=1980))
+        await utils.Pages(ctx, pages.__getitem__, len(pages)).send()
+
+    @commands.command()
+    async def dmg(self, ctx, *, args: str):
+        """Calculates the expected damage of every move of a weapon.
+
+        The weapon is either the name of a weapon or a weapon type given with its stats.
+        Options are chosen by doing --option value, they override the stats of a named weapon.
+        attack: The displayed attack.
+        affinity: The affinity in percent.
+        element: The displayed element or status.
+        sharpness: The sharpness color, by default the highest one of each weapon.
+        hitzone: The raw hitzone of the monster, 100 by default.
+        element-hitzone: The elemental hitzone of the monster, 100 by default.
+        vs: Names of weapons of the same type to compare the total damage over the moveset with.
+        """
+
+        parser = Arguments(add_help=False, allow_abbrev=False)
+        parser.add_argument('weapon', nargs='+')
+        parser.add_argument('--attack', type=int)
+        parser.add_argument('--affinity', type=int)
+        parser.add_argument('--element', type=int)
+        parser.add_argument('--sharpness', type=str.lower, choices=tuple(mhw.SHARPNESS))
+        parser.add_argument('--hitzone', type=int, default=100)
+        parser.add_argument('--element-hitzone', type=int, default=100)
+        parser.add_argument('--vs', nargs='+', default=[])
+
+        try:
+            args = parser.parse_args(shlex.split(args))
+        except Exception as e:
+            return await ctx.send(e)
+
+        name = ' '.join(args.weapon)
+        weapon = self.data.weapons.get(name.lower())
+        stats = {'attack': args.attack, 'affinity': args.affinity, 'element_attack': args.element}
+        if weapon is None:
+            weapon_type = self.weapon_aliases.get(name.lower())
+            if weapon_type is None and not self.data.weapons:
+                return await ctx.send('There is no weapon data, give a weapon type with its stats instead, '
+                                      'e.g. great sword --attack 1000.')
+            elif weapon_type is None:
+                return await self.show_possibilities(ctx, 'weapons', name)
+
+            if args.attack is None:
+                return await ctx.send('The attack of the weapon is needed, e.g. --attack 1000.')
+
+            weapon = mhw.Weapon(weapon_type.title(), weapon_type, None, args.attack, args.affinity or 0, None,
+                                args.element, ())
+        else:
+            weapon = weapon._replace(**{stat: value for stat, value in stats.items() if value is not None})
+
+        moveset = self.movesets.get(weapon.type)
+        if moveset is None or weapon.type not in mhw.BLOAT:
+            return await ctx.send(f'There are no motion values for {weapon.type}.')
+
+        sharpness = args.sharpness or mhw.sharpness_color(weapon.sharpness)
+        hitzones = {'hitzone': args.hitzone, 'element_hitzone': args.element_hitzone}
+
+        if args.vs:
+            if not self.data.weapons:
+                return await ctx.send('There is no weapon data to compare with.')
+
+            weapons = [weapon]
+            for other_name in args.vs:
+                other = self.data.weapons.get(other_name.lower())
+                if other is None or other.type != weapon.type:
+                    return await ctx.send(f'"{other_name}" is not a known {weapon.type}.')
+                weapons.append(other)
+
+            table = utils.TabularData()
+            table.set_columns(['Weapon', 'Raw', 'Element', 'Total'])
+            totals = mhw.compare(moveset, weapons, args.sharpness, **hitzones)
+            for compared, (raw, element) in zip(weapons, totals):
+                table.add_row([compared.name, f'{raw:.0f}', f'{element:.0f}', f'{raw + element:.0f}'])
+
+            return await ctx.send(f'Total damage over the {weapon.type} moveset\n```\n{table.render()}\n```')
+
+        with ctx.timer('compute'):
+            raw, element = mhw.damage(moveset, weapon.type, weapon.attack, weapon.affinity, weapon.element_attack,
+                                      sharpness, **hitzones)
+
+        table = utils.TabularData()
+        table.set_columns(['Move', 'Hits', 'Raw', 'Element', 'Total'])
+        table.add_rows([move, hits, f'{raw_damage:.1f}', f'{element_damage:.1f}', f'{raw_damage + element_damage:.1f}']
+                       for move, hits, raw_damage, element_damage in zip(moveset.moves, moveset.hits, raw, element))
+
+        element_name = weapon.element or 'element'
+        summary = f'{weapon.name}: {weapon.attack} attack, {weapon.affinity}% affinity, ' \
+                  f'{weapon.element_attack or 0} {element_name}, {sharpness or "no"} sharpness, ' \
+                  f'hitzones {args.hitzone}/{args.element_hitzone}'
+
+        pages = tuple(table.paginate(max_size=1800))
+        await utils.Pages(ctx, lambda index: f'{summary}\n{pages[index]}', len(pages)).send()
+
+    @commands.command()
+    async def build(self, ctx, *, skills: str):
+        """Finds the armor, charm and decorations with the most defense for the given skills.
+
+        Skills are separated by commas and may be followed by the level wanted,
+        e.g. weakness exploit 3, critical eye 4. Without a level the maximum level is used.
+        """
+
+        requirements = {}
+        for entry in filter(None, map(str.strip, skills.split(','))):
+            name, level = skill_level(entry, default=None)
+            skill = self.data.skills.get(name.lower())
+            if skill is None:
+                return await self.show_possibilities(ctx, 'skills', name)
+
+            max_level = len(skill.levels) or level or 1
+            requirements[skill.name] = max_level if level is None else min(level, max_level)
+
+        if not requirements:
+            return await ctx.send('No skills given.')
+
+        # Identical searches running at the same time share one worker process.
+        key = ('build', self.data, tuple(sorted(requirements.items())))
+        if key in self.in_flight:
+            ctx.increment('coalesced')
+
+        problem = mhw.make_problem(self.data, requirements)
+
+        async with ctx.typing():
+            with ctx.timer('compute'):
+                builds, complete = await self.in_flight.do(key, ctx.bot.executor.run_in_process, mhw.find_builds,
+                                                           problem, limit=3, budget=5.0)
+
+        if not builds:
+            if not complete:
+                return await ctx.send('No build found within the time limit.')
+            return await ctx.send('No build can reach those skills.')
+
+        embed = discord.Embed(title=', '.join(f'{skill} {level}' for skill, level in requirements.items()))
+        for index, build in enumerate(builds, 1):
+            lines = [f'{part}: {armor}' for part, armor in zip(mhw.PARTS, build.armors)]
+            lines.append(f'Charm: {build.charm or "None"}')
+            decorations = ', '.join(f'{decoration} x{amount}' for decoration, amount in build.decorations)
+            lines.append(f'Decorations: {decorations or "None"}')
+            lines.append(f'Free slots: {build.free_slots}')
+            embed.add_field(name=f'#{index} - {build.defense} defense', value='\n'.join(lines), inline=False)
+
+        if not complete:
+            embed.set_footer(text='The search ran out of time, there may be better builds.')
+
+        await ctx.send(embed=embed)
 
     async def show_possibilities(self, ctx, table_name, name):
-        query = f"""
-                SELECT
-                    STRING_AGG(name, E'\n' ORDER BY SIMILARITY(name, $1) DESC)
-                FROM world.{table_name}
-                WHERE name % $1;
-                """
-        possibilities = await ctx.bot.pool.fetchval(query, name)
-        if possibilities is None:
+        # Names starting with what was typed come first, then the closest misspellings.
+        completions = [string.capwords(completion)
+                       for completion, _, _ in self.data.names.complete(name, (table_name,), limit=30)]
+        seen = {completion.lower() for completion in completions}
+        suggestions = self.data.fuzzy[table_name].search(name, limit=30)
+        possibilities = (completions + [suggestion for suggestion, _ in suggestions if suggestion.lower() not in seen])[:30]
+        if not possibilities:
             return await ctx.send(f'{table_name.title()[:-1]} not found.')
 
-        return await ctx.send(f'{table_name.title()[:-1]} not found. Did you mean...\n{possibilities}')
+        per_page = 10
+
+        def get_page(index):
+            names = possibilities[index * per_page:(index + 1) * per_page]
+            return f'{table_name.title()[:-1]} not found. Did you mean...\n' + '\n'.join(names)
 
+        pages = (len(possibilities) - 1) // per_page + 1
+        return await utils.Pages(ctx, get_page, pages).send()
 
 def setup(bot):
-    bot.add_cog(World())
+    bot.add_cog(World(bot))
@@ -1,10 +1,12 @@
-import json
+import time
 import asyncio
 
 import click
 import asyncpg
 
 import config
+import mhw
+import utils
 from bot import Bot
 
 
@@ -12,6 +14,8 @@ async def create_db(pool):
     query = f"""
             CREATE SCHEMA IF NOT EXISTS world;
 
+            CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
             CREATE TABLE IF NOT EXISTS world.skills (
                 name TEXT PRIMARY KEY,
                 description TEXT NOT NULL
@@ -83,227 +87,136 @@ async def create_db(pool):
                 rarity SMALLINT NOT NULL,
                 skill TEXT REFERENCES world.skills(name) NOT NULL
             );
-            """
 
-    await pool.execute(query)
+            CREATE TABLE IF NOT EXISTS world.weapons (
+                name TEXT PRIMARY KEY,
+                type TEXT NOT NULL,
+                rarity SMALLINT NOT NULL,
+                attack SMALLINT NOT NULL,
+                affinity SMALLINT NOT NULL,
+                element TEXT,
+                element_attack SMALLINT,
+                sharpness SMALLINT[] NOT NULL
+            );
 
+            CREATE INDEX IF NOT EXISTS skills_name_trgm_idx ON world.skills USING GIN (name gin_trgm_ops);
+            CREATE INDEX IF NOT EXISTS armors_name_trgm_idx ON world.armors USING GIN (name gin_trgm_ops);
+            CREATE INDEX IF NOT EXISTS charms_name_trgm_idx ON world.charms USING GIN (name gin_trgm_ops);
+            CREATE INDEX IF NOT EXISTS decorations_name_trgm_idx ON world.decorations USING GIN (name gin_trgm_ops);
 
-async def drop_db(pool):
-    query = """
-            DROP SCHEMA world CASCADE;
+            CREATE INDEX IF NOT EXISTS armor_materials_material_idx ON world.armor_materials (material);
+            CREATE INDEX IF NOT EXISTS charm_materials_material_idx ON world.charm_materials (material);
+
+            CREATE TABLE IF NOT EXISTS world.sync_state (
+                kind TEXT,
+                key TEXT,
+                hash TEXT NOT NULL,
+                PRIMARY KEY(kind, key)
+            );
             """
 
     await pool.execute(query)
 
 
-async def update_db(pool):
+async def drop_db(pool):
     query = """
-            INSERT INTO world.skills (
-                name,
-                description
-            ) VALUES ($1, $2)
-            ON CONFLICT (name)
-            DO UPDATE
-            SET description = excluded.description;
+            DROP SCHEMA world CASCADE;
             """
 
-    with open('mhw/skills.json') as f:
-        skills = json.load(f)
-
-    for skill in skills:
-        await pool.execute(query, skill["Name"], skill["Description"])
-
-    query = """
-            INSERT INTO world.skill_levels (
-                name,
-                level,
-                effect
-            ) VALUES ($1, $2, $3)
-            ON CONFLICT (name, level)
-            DO UPDATE
-            SET effect = excluded.effect
-            """
+    await pool.execute(query)
 
-    for skill in skills:
-        levels = skill.get('Levels')
-        if levels is None:
-            continue
 
-        for level, effect in enumerate(levels, 1):
-            await pool.execute(query, skill['Name'], level, effect)
+async def update_db(pool, *, dry_run=False, force=False):
+    state = await mhw.fetch_state(pool)
+    deltas = mhw.diff_entities(state, force=force)
 
-    query = """
-            INSERT INTO world.items (
-                name
-            ) VALUES ($1)
-            ON CONFLICT
-            DO NOTHING;
-            """
+    for delta in deltas:
+        print(f'{delta.kind}: {len(delta.inserted)} inserted, {len(delta.updated)} updated, '
+              f'{len(delta.deleted)} deleted')
 
-    with open('mhw/items.json') as f:
-        items = json.load(f)
+        if dry_run:
+            for prefix, names in (('+', delta.inserted), ('~', delta.updated), ('-', delta.deleted)):
+                for name in names:
+                    print(f'  {prefix} {name}')
 
-    for item in items:
-        await pool.execute(query, item)
+    if not deltas:
+        print('Already up to date.')
 
-    query = """
-            INSERT INTO world.armors (
-                name,
-                rarity,
-                price,
-                part,
-                min_def,
-                max_def,
-                slots,
-                slot_levels,
-                sex,
-                fire_res,
-                water_res,
-                thunder_res,
-                ice_res,
-                dragon_res
-            ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14)
-            ON CONFLICT (name)
-            DO UPDATE
-            SET
-                rarity = excluded.rarity,
-                price = excluded.price,
-                part = excluded.part,
-                min_def = excluded.min_def,
-                max_def = excluded.max_def,
-                slots = excluded.slots,
-                slot_levels = excluded.slot_levels,
-                sex = excluded.sex,
-                fire_res = excluded.fire_res,
-                water_res = excluded.water_res,
-                thunder_res = excluded.thunder_res,
-                ice_res = excluded.ice_res,
-                dragon_res = excluded.dragon_res;
-            """
+    if dry_run or not deltas:
+        return
 
-    with open('mhw/armor.json') as f:
-        armors = json.load(f)
+    timings = await mhw.apply_deltas(pool, deltas)
+    if not timings:
+        return
 
-    for armor in armors:
-        await pool.execute(query, armor['Name'], armor['Rarity'], armor['Price'], armor['Part'], armor['Min Def'],
-                           armor['Max Def'], armor['Slots'], armor['Slot Levels'], armor['Sex'],
-                           armor['Fire Resistance'], armor['Water Resistance'], armor['Thunder Resistance'],
-                           armor['Ice Resistance'], armor['Dragon Resistance'])
+    width = max(len(table) for table, *_ in timings)
+    for table, rows, elapsed in timings:
+        print(f'{table:<{width}} {rows:>6} rows {elapsed * 1000:>9.2f}ms')
 
-    query = """
-            INSERT INTO world.armor_skills (
-                name,
-                skill,
-                level
-            ) VALUES ($1, $2, $3)
-            ON CONFLICT (name, skill)
-            DO UPDATE
-            SET level = excluded.level;
-            """
+    total = sum(elapsed for *_, elapsed in timings)
+    print(f'{"total":<{width}} {sum(rows for _, rows, _ in timings):>6} rows {total * 1000:>9.2f}ms')
 
-    for armor in armors:
-        for skill in armor['Skills']:
-            await pool.execute(query, armor['Name'], skill['Name'], skill['Level'])
 
-    query = """
-            INSERT INTO world.armor_materials (
-                name,
-                material,
-                amount
-            ) VALUES ($1, $2, $3)
-            ON CONFLICT (name, material)
-            DO UPDATE
-            SET amount = excluded.amount;
-            """
+def create_pool(loop):
+    """Creates the connection pool, sized and tuned through the optional pool settings in config.
 
-    for armor in armors:
-        for material in armor['Materials']:
-            await pool.execute(query, armor['Name'], material['Name'], material['Amount'])
+    The registered World queries are prepared on every new connection.
+    """
 
-    with open('mhw/charms.json') as f:
-        charms = json.load(f)
+    kwargs = {
+        'command_timeout': 60,
+        'min_size': getattr(config, 'pool_min_size', 10),
+        'max_size': getattr(config, 'pool_max_size', 10),
+        'statement_cache_size': getattr(config, 'statement_cache_size', 100),
+        'max_inactive_connection_lifetime': getattr(config, 'pool_max_inactive_lifetime', 300.0),
+        'init': mhw.queries.prepare,
+    }
 
-    query = """
-            INSERT INTO world.charms (
-                name
-            ) VALUES ($1)
-            ON CONFLICT (name)
-            DO NOTHING;
-            """
+    return loop.run_until_complete(asyncpg.create_pool(config.dsn, **kwargs))
 
-    for charm in charms:
-        await pool.execute(query, charm['Name'])
 
-    query = """
-            INSERT INTO world.charm_skills (
-                name,
-                skill,
-                level
-            ) VALUES ($1, $2, $3)
-            ON CONFLICT (name, skill)
-            DO UPDATE
-            SET level = excluded.level;
-            """
+def run_bot(**kwargs):
+    loop = asyncio.get_event_loop()
+    start = time.perf_counter()
+    pool = create_pool(loop)
+    bot = Bot(pool=pool, loop=loop, startup_timings=[('pool', time.perf_counter() - start)], **kwargs)
+    bot.run(config.token)
 
-    for charm in charms:
-        for skill in charm['Skills']:
-            await pool.execute(query, charm['Name'], skill['Name'], skill['Level'])
 
-    query = """
-            INSERT INTO world.charm_materials (
-                name,
-                material,
-                amount
-            ) VALUES ($1, $2, $3)
-            ON CONFLICT (name, material)
-            DO UPDATE
-            SET amount = excluded.amount;
-            """
+def run_worker(shard_count, shard_ids, worker, health):
+    print(f'Worker {worker} running shards {", ".join(map(str, shard_ids))} of {shard_count}.')
+    run_bot(shard_count=shard_count, shard_ids=shard_ids, worker=worker, health=health)
 
-    for charm in charms:
-        materials = charm.get('Materials')
-        if materials is None:
-            continue
 
-        for material in materials:
-            await pool.execute(query, charm['Name'], material['Name'], material['Amount'])
+def run_supervisor(shards, processes):
+    """Spreads the shards across worker processes, each with its own bot and pool."""
 
-    query = """
-            INSERT INTO world.decorations (
-                name,
-                slot_level,
-                rarity,
-                skill
-            ) VALUES ($1, $2, $3, $4)
-            ON CONFLICT (name)
-            DO UPDATE
-            SET
-                slot_level = excluded.slot_level,
-                rarity = excluded.rarity,
-                skill = excluded.skill;
-            """
+    workers = [(shards, list(range(shards))[worker::processes]) for worker in range(processes)]
+    supervisor = utils.Supervisor(run_worker, workers, interval=getattr(config, 'health_interval', 30),
+                                  health_file=getattr(config, 'health_file', None))
+    supervisor.run()
 
-    with open('mhw/decorations.json') as f:
-        decorations = json.load(f)
 
-    for decoration in decorations:
-        await pool.execute(query, decoration['Name'], decoration['Slot Level'], decoration['Rarity'], decoration['Skill'])
+@click.group(invoke_without_command=True)
+@click.option('--shards', type=click.IntRange(1), help='Total number of shards, by default the recommended count.')
+@click.option('--processes', type=click.IntRange(1), default=1, help='Number of processes to spread the shards across.')
+@click.pass_context
+def main(ctx, shards, processes):
+    """Launches the bot."""
 
+    if ctx.invoked_subcommand is not None:
+        return
 
-def run_bot():
-    loop = asyncio.get_event_loop()
-    pool = loop.run_until_complete(asyncpg.create_pool(config.dsn, command_timeout=60))
-    bot = Bot(pool=pool, loop=loop)
-    bot.run(config.token)
+    if processes == 1:
+        return run_bot(shard_count=shards)
 
+    if shards is None:
+        raise click.UsageError('--processes needs --shards to split the shards between processes.')
 
-@click.group(invoke_without_command=True)
-@click.pass_context
-def main(ctx):
-    """Launches the bot."""
+    if processes > shards:
+        raise click.UsageError('--processes cannot be more than --shards.')
 
-    if ctx.invoked_subcommand is None:
-        run_bot()
+    run_supervisor(shards, processes)
 
 
 @main.group()
@@ -316,17 +229,19 @@ def init():
     """Creates the database."""
 
     loop = asyncio.get_event_loop()
-    pool = loop.run_until_complete(asyncpg.create_pool(config.dsn, command_timeout=60))
+    pool = create_pool(loop)
     loop.run_until_complete(create_db(pool))
 
 
 @db.command()
-def update():
+@click.option('--dry-run', is_flag=True, help='Only print what would change.')
+@click.option('--force', is_flag=True, help='Rewrite every entity even if it did not change.')
+def update(dry_run, force):
     """Updates the database."""
 
     loop = asyncio.get_event_loop()
-    pool = loop.run_until_complete(asyncpg.create_pool(config.dsn, command_timeout=60))
-    loop.run_until_complete(update_db(pool))
+    pool = create_pool(loop)
+    loop.run_until_complete(update_db(pool, dry_run=dry_run, force=force))
 
 
 @db.command()
@@ -334,7 +249,7 @@ def drop():
     """Drops the database."""
 
     loop = asyncio.get_event_loop()
-    pool = loop.run_until_complete(asyncpg.create_pool(config.dsn, command_timeout=60))
+    pool = create_pool(loop)
     loop.run_until_complete(drop_db(pool))
 
 
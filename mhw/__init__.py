@@ -0,0 +1,7 @@
+from .tables import *
+from .models import *
+from .snapshot import *
+from .sync import *
+from .search import *
+from .builder import *
+from .damage import *
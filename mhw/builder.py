@@ -0,0 +1,167 @@
+import time
+import heapq
+import collections
+
+from .search import PARTS
+
+
+__all__ = ('Piece', 'BuildProblem', 'Build', 'make_problem', 'find_builds')
+
+
+# skills is a tuple of points aligned with BuildProblem.skills, slots are the nonzero slot levels.
+Piece = collections.namedtuple('Piece', 'name skills slots defense')
+BuildProblem = collections.namedtuple('BuildProblem', 'skills levels decorations parts')
+Build = collections.namedtuple('Build', 'armors charm decorations defense free_slots')
+
+
+def dominates(first, second):
+    return all(a >= b for a, b in zip(first.skills, second.skills)) and \
+           len(first.slots) >= len(second.slots) and \
+           all(a >= b for a, b in zip(first.slots, second.slots)) and \
+           first.defense >= second.defense
+
+
+def prune(pieces):
+    """Drops every piece that another piece is at least as good as in every way."""
+
+    kept = []
+    for piece in sorted(pieces, key=lambda p: (sum(p.skills), p.slots, p.defense), reverse=True):
+        if not any(dominates(other, piece) for other in kept):
+            kept.append(piece)
+
+    return tuple(kept)
+
+
+def make_problem(data, requirements):
+    """Reduces a snapshot to the pieces relevant for reaching the required skill levels.
+
+    requirements maps skill names to levels. The result only holds plain
+    tuples so it can be sent to another process.
+    """
+
+    skills = tuple(requirements)
+    levels = tuple(requirements.values())
+
+    def points(skill_levels):
+        skill_levels = dict(skill_levels)
+        return tuple(skill_levels.get(skill, 0) for skill in skills)
+
+    by_skill = {decoration.skill: decoration for decoration in data.decorations.values()}
+    decorations = tuple((by_skill[skill].name, by_skill[skill].slot_level) if skill in by_skill else None
+                        for skill in skills)
+
+    parts = {part: [] for part in PARTS}
+    for armor in data.armors.values():
+        slots = tuple(sorted((level for level in armor.slot_levels if level), reverse=True))
+        parts[armor.part].append(Piece(armor.name, points(armor.skills), slots, armor.max_def))
+
+    charms = [Piece(None, (0,) * len(skills), (), 0)]
+    for charm in (charm for levels in data.charms.values() for charm in levels):
+        charm_points = points(charm.skills)
+        if any(charm_points):
+            charms.append(Piece(charm.name, charm_points, (), 0))
+
+    return BuildProblem(skills, levels, decorations, tuple(prune(parts[part]) for part in PARTS) + (prune(charms),))
+
+
+def assign_decorations(problem, totals, slots):
+    """Returns the decorations needed to make up for missing skill points, or None if they do not fit."""
+
+    needed = []
+    for index, (level, total) in enumerate(zip(problem.levels, totals)):
+        missing = level - total
+        if missing <= 0:
+            continue
+
+        decoration = problem.decorations[index]
+        if decoration is None:
+            return None
+
+        needed.extend([decoration] * missing)
+
+    if len(needed) > len(slots):
+        return None
+
+    needed.sort(key=lambda decoration: decoration[1], reverse=True)
+    slots = sorted(slots, reverse=True)
+    if any(slot_level > slot for (_, slot_level), slot in zip(needed, slots)):
+        return None
+
+    return tuple(collections.Counter(name for name, _ in needed).items()), len(slots) - len(needed)
+
+
+def find_builds(problem, *, limit=5, budget=2.0):
+    """Searches for the builds with the most defense that reach every required skill level.
+
+    The search is a depth first branch and bound over the armor parts and
+    the charm, decorations are fitted into the free slots at the leaves.
+    It stops after budget seconds and returns (builds, complete) where
+    complete is False if the search ran out of time.
+    """
+
+    deadline = time.perf_counter() + budget
+    parts = problem.parts
+    count = len(problem.skills)
+
+    # Upper bounds for what the parts from depth onwards can still contribute.
+    max_points = [[0] * count for _ in range(len(parts) + 1)]
+    max_slots = [0] * (len(parts) + 1)
+    max_defense = [0] * (len(parts) + 1)
+    for depth in reversed(range(len(parts))):
+        pieces = parts[depth]
+        for skill in range(count):
+            max_points[depth][skill] = max_points[depth + 1][skill] + max(piece.skills[skill] for piece in pieces)
+        max_slots[depth] = max_slots[depth + 1] + max(len(piece.slots) for piece in pieces)
+        max_defense[depth] = max_defense[depth + 1] + max(piece.defense for piece in pieces)
+
+    best = []
+    chosen = []
+    nodes = 0
+    complete = True
+
+    def bounded(depth, totals, slots, defense):
+        if len(best) == limit and defense + max_defense[depth] < best[0][0]:
+            return True
+
+        missing = 0
+        for skill in range(count):
+            deficit = problem.levels[skill] - totals[skill] - max_points[depth][skill]
+            if deficit > 0:
+                if problem.decorations[skill] is None:
+                    return True
+                missing += deficit
+
+        return missing > len(slots) + max_slots[depth]
+
+    def search(depth, totals, slots, defense):
+        nonlocal nodes, complete
+
+        nodes += 1
+        if nodes % 1024 == 0 and time.perf_counter() > deadline:
+            complete = False
+
+        if not complete or bounded(depth, totals, slots, defense):
+            return
+
+        if depth == len(parts):
+            result = assign_decorations(problem, totals, slots)
+            if result is None:
+                return
+
+            decorations, free_slots = result
+            *armors, charm = chosen
+            entry = (defense, free_slots, nodes, Build(tuple(armors), charm, decorations, defense, free_slots))
+            if len(best) < limit:
+                heapq.heappush(best, entry)
+            elif entry > best[0]:
+                heapq.heapreplace(best, entry)
+            return
+
+        for piece in parts[depth]:
+            chosen.append(piece.name)
+            search(depth + 1, [a + b for a, b in zip(totals, piece.skills)], slots + piece.slots,
+                   defense + piece.defense)
+            chosen.pop()
+
+    search(0, [0] * count, (), 0)
+    return [build for *_, build in sorted(best, reverse=True)], complete
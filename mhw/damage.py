@@ -0,0 +1,101 @@
+import array
+import collections
+
+
+__all__ = ('SHARPNESS', 'BLOAT', 'Moveset', 'make_moveset', 'sharpness_color', 'damage', 'compare')
+
+
+# Colors in the order sharpness bars are stored, with their raw and element multipliers.
+SHARPNESS = collections.OrderedDict((
+    ('red', (0.5, 0.25)),
+    ('orange', (0.75, 0.5)),
+    ('yellow', (1.0, 0.75)),
+    ('green', (1.05, 1.0)),
+    ('blue', (1.2, 1.0625)),
+    ('white', (1.32, 1.15)),
+    ('purple', (1.39, 1.25)),
+))
+
+# Displayed attack is the true raw multiplied by a class specific bloat value.
+BLOAT = {
+    'great sword': 4.8,
+    'long sword': 3.3,
+    'sword and shield': 1.4,
+    'dual blades': 1.4,
+    'hammer': 5.2,
+    'hunting horn': 4.2,
+    'lance': 2.3,
+    'gunlance': 2.3,
+    'switch axe': 3.5,
+    'charge blade': 3.6,
+    'insect glaive': 3.1,
+    'light bowgun': 1.3,
+    'heavy bowgun': 1.5,
+    'bow': 1.2,
+}
+
+CRITICAL = 0.25
+
+
+# Columns of a moveset: the total motion value and number of hits of every move.
+Moveset = collections.namedtuple('Moveset', 'moves motion hits')
+
+
+def make_moveset(motion_values):
+    """Builds a moveset out of the MotionValue tuples of a weapon."""
+
+    return Moveset(tuple(value.move for value in motion_values),
+                   array.array('d', (sum(value.hits) for value in motion_values)),
+                   array.array('H', (len(value.hits) for value in motion_values)))
+
+
+def sharpness_color(sharpness):
+    """Returns the highest color of a sharpness bar, or None for weapons without sharpness."""
+
+    colors = [color for color, hits in zip(SHARPNESS, sharpness) if hits]
+    return colors[-1] if colors else None
+
+
+def multipliers(weapon_type, attack, affinity=0, element_attack=None, sharpness=None, *, hitzone=100,
+                element_hitzone=100):
+    """Returns what the motion value and the hit count of a move are multiplied by for raw and element damage."""
+
+    raw_sharpness, element_sharpness = SHARPNESS[sharpness] if sharpness is not None else (1.0, 1.0)
+    true_raw = attack / BLOAT.get(weapon_type, 1.0)
+    expected_critical = 1 + max(min(affinity, 100), -100) / 100 * CRITICAL
+
+    raw = true_raw / 100 * raw_sharpness * expected_critical * hitzone / 100
+    element = (element_attack or 0) / 10 * element_sharpness * element_hitzone / 100
+    return raw, element
+
+
+def damage(moveset, weapon_type, attack, affinity=0, element_attack=None, sharpness=None, **hitzones):
+    """Returns arrays of the expected raw and element damage of every move of the moveset.
+
+    Raw damage accounts for sharpness, affinity and the raw hitzone and
+    element damage for sharpness and the elemental hitzone. Each array is
+    a moveset column times one multiplier, filled by a plain loop.
+    """
+
+    raw, element = multipliers(weapon_type, attack, affinity, element_attack, sharpness, **hitzones)
+    return (array.array('d', (motion * raw for motion in moveset.motion)),
+            array.array('d', (hits * element for hits in moveset.hits)))
+
+
+def compare(moveset, weapons, sharpness=None, **hitzones):
+    """Returns the total raw and element damage over the whole moveset for each of the weapons.
+
+    Weapons use the highest color of their sharpness unless sharpness gives
+    the color for all of them. The totals are the dot product of the moveset
+    columns with each weapon's multipliers, so only two sums are done per
+    moveset however many weapons there are.
+    """
+
+    motion, hits = sum(moveset.motion), sum(moveset.hits)
+    results = []
+    for weapon in weapons:
+        raw, element = multipliers(weapon.type, weapon.attack, weapon.affinity, weapon.element_attack,
+                                   sharpness or sharpness_color(weapon.sharpness), **hitzones)
+        results.append((motion * raw, hits * element))
+
+    return results
@@ -0,0 +1,65 @@
+import sys
+import json
+import array
+import collections
+
+
+__all__ = ('Skill', 'Armor', 'Charm', 'Decoration', 'Weapon', 'Material', 'MotionValue',
+           'intern_rows', 'parse_hits', 'load_motion_values')
+
+
+# Named tuples have no per instance __dict__, which keeps the thousands of
+# rows held in memory at the size of a plain tuple.
+Skill = collections.namedtuple('Skill', 'name description levels armors charms decoration')
+Armor = collections.namedtuple('Armor', 'name rarity price part min_def max_def slots slot_levels sex fire_res '
+                                        'water_res thunder_res ice_res dragon_res skills materials')
+Charm = collections.namedtuple('Charm', 'name skills materials')
+Decoration = collections.namedtuple('Decoration', 'name slot_level rarity skill')
+Weapon = collections.namedtuple('Weapon', 'name type rarity attack affinity element element_attack sharpness')
+Material = collections.namedtuple('Material', 'name armors charms')
+MotionValue = collections.namedtuple('MotionValue', 'move damage_type motion_value stun exhaust hits')
+
+
+def intern_rows(tables):
+    """Interns every string in the rows of each table.
+
+    Names repeat across tables, e.g. a skill name appears in every armor,
+    charm and decoration that has it, and both json and asyncpg create a
+    new string for each occurrence.
+    """
+
+    def intern(value):
+        if isinstance(value, str):
+            return sys.intern(value)
+        return value
+
+    return {table: [tuple(intern(value) for value in row) for row in rows] for table, rows in tables.items()}
+
+
+def parse_hits(motion_value):
+    """Splits a motion value such as 20+182 or 10*7 into an array of the motion value of each hit."""
+
+    hits = array.array('H')
+    for term in str(motion_value).split('+'):
+        value, _, count = term.partition('*')
+        if value.isdigit():
+            hits.extend([int(value)] * (int(count) if count.isdigit() else 1))
+
+    return hits
+
+
+def load_motion_values(path='mhw/motionvalues.json'):
+    """Reads the motion values file into a tuple of MotionValue per weapon."""
+
+    with open(path) as f:
+        data = json.load(f)
+
+    return {
+        sys.intern(weapon): tuple(
+            MotionValue(sys.intern(move), sys.intern(values['Damage Type']), sys.intern(str(values['Motion Value'])),
+                        sys.intern(str(values['Stun'])), sys.intern(str(values['Exhaust'])),
+                        parse_hits(values['Motion Value']))
+            for move, values in moves.items()
+        )
+        for weapon, moves in data.items()
+    }
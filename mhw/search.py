@@ -0,0 +1,93 @@
+import array
+import operator
+import collections
+
+
+__all__ = ('PARTS', 'RESISTANCES', 'COMPARISONS', 'ArmorIndex')
+
+
+PARTS = ('Helm', 'Torso', 'Arms', 'Waist', 'Legs')
+RESISTANCES = ('fire', 'water', 'thunder', 'ice', 'dragon')
+COMPARISONS = {
+    '>=': operator.ge,
+    '<=': operator.le,
+    '>': operator.gt,
+    '<': operator.lt,
+    '=': operator.eq,
+}
+
+
+class ArmorIndex:
+    """A columnar index over armor.
+
+    Parts, rarities and skills are kept as inverted indexes that narrow
+    down the candidates, the numeric columns are checked on what is left.
+    """
+
+    def __init__(self, armors):
+        self.armors = tuple(sorted(armors, key=lambda armor: armor.name))
+
+        self.parts = collections.defaultdict(set)
+        self.rarities = collections.defaultdict(set)
+        self.skills = collections.defaultdict(dict)
+
+        self.rarity = array.array('h', (armor.rarity for armor in self.armors))
+        self.min_def = array.array('h', (armor.min_def for armor in self.armors))
+        self.max_def = array.array('h', (armor.max_def for armor in self.armors))
+        self.slot_levels = tuple(array.array('h', (armor.slot_levels[slot] for armor in self.armors))
+                                 for slot in range(3))
+        self.resistances = {
+            element: array.array('h', (getattr(armor, f'{element}_res') for armor in self.armors))
+            for element in RESISTANCES
+        }
+
+        for index, armor in enumerate(self.armors):
+            self.parts[armor.part].add(index)
+            self.rarities[armor.rarity].add(index)
+            for skill, level in armor.skills:
+                self.skills[skill.lower()][index] = level
+
+    def __len__(self):
+        return len(self.armors)
+
+    def search(self, *, parts=(), rarities=(), slots=(), min_def=None, resistances=(), skills=()):
+        """Returns the armor matching every given filter, best matches first.
+
+        slots are the minimum slot levels in order, resistances are
+        (element, comparison, value) triples and skills are (name, minimum level)
+        pairs. Results are ranked by the sum of the requested skill levels,
+        then by maximum defense.
+        """
+
+        candidates = None
+
+        def narrow(indexes):
+            nonlocal candidates
+            candidates = indexes if candidates is None else candidates & indexes
+
+        if parts:
+            narrow(set().union(*(self.parts[part] for part in parts)))
+
+        if rarities:
+            narrow(set().union(*(self.rarities[rarity] for rarity in rarities)))
+
+        skills = [(skill.lower(), level) for skill, level in skills]
+        for skill, level in skills:
+            narrow({index for index, value in self.skills.get(skill, {}).items() if value >= level})
+
+        if candidates is None:
+            candidates = range(len(self.armors))
+
+        checks = [(self.slot_levels[slot], operator.ge, level) for slot, level in enumerate(slots) if level]
+        checks.extend((self.resistances[element], COMPARISONS[op], value) for element, op, value in resistances)
+        if min_def is not None:
+            checks.append((self.min_def, operator.ge, min_def))
+
+        results = [index for index in candidates if all(op(column[index], value) for column, op, value in checks)]
+
+        def rank(index):
+            points = sum(self.skills[skill].get(index, 0) for skill, _ in skills)
+            return -points, -self.max_def[index], -self.rarity[index], index
+
+        results.sort(key=rank)
+        return [self.armors[index] for index in results]
@@ -0,0 +1,161 @@
+import collections
+from types import MappingProxyType
+
+import utils
+
+from .tables import TABLES, ENTITIES, load_cached
+from .models import Skill, Armor, Charm, Decoration, Weapon, Material, intern_rows
+from .search import ArmorIndex
+
+
+__all__ = ('Snapshot', 'queries')
+
+
+queries = utils.QueryRegistry()
+
+for _, _, names, _ in ENTITIES:
+    for table in names:
+        queries.register(f'select_{table}', f'SELECT {", ".join(TABLES[table][0])} FROM world.{table};')
+
+
+def base_name(name, suffix):
+    """Strips the level part of a charm or decoration name, e.g. Attack Charm II -> attack."""
+
+    return name.lower().partition(f' {suffix}')[0]
+
+
+class Snapshot:
+    """A read-only copy of the world schema indexed by lowercase name.
+
+    Charms and decorations are keyed on their name without the level
+    suffix, charms hold every level ordered by name. materials maps an item
+    to the armor and charms crafted from it. names resolves user input to
+    the key and kind of what it names, fuzzy holds a trigram index over the
+    full names of each table for suggestions and armor_index is used to
+    search armor.
+    """
+
+    __slots__ = ('skills', 'items', 'armors', 'charms', 'decorations', 'weapons', 'materials', 'names',
+                 'fuzzy', 'armor_index')
+
+    def __init__(self, tables):
+        tables = intern_rows(tables)
+
+        def group(table):
+            grouped = collections.defaultdict(list)
+            for name, *rest in tables.get(table, ()):
+                grouped[name].append(tuple(rest))
+            return {name: tuple(sorted(rows)) for name, rows in grouped.items()}
+
+        armor_skills = group('armor_skills')
+        armor_materials = group('armor_materials')
+        charm_skills = group('charm_skills')
+        charm_materials = group('charm_materials')
+        skill_levels = group('skill_levels')
+
+        skill_armors = collections.defaultdict(list)
+        for name, skill, level in tables.get('armor_skills', ()):
+            skill_armors[skill].append((name, level))
+
+        skill_charms = collections.defaultdict(list)
+        for name, skill, level in tables.get('charm_skills', ()):
+            skill_charms[skill].append((name, level))
+
+        decorations = {}
+        skill_decorations = {}
+        for row in tables.get('decorations', ()):
+            decoration = Decoration(*row)
+            decorations.setdefault(base_name(decoration.name, 'jewel'), decoration)
+            skill_decorations.setdefault(decoration.skill, decoration.name)
+
+        skills = {}
+        for name, description in tables.get('skills', ()):
+            skills[name.lower()] = Skill(name, description, skill_levels.get(name, ()),
+                                         tuple(sorted(skill_armors[name])), tuple(sorted(skill_charms[name])),
+                                         skill_decorations.get(name))
+
+        armors = {}
+        for row in tables.get('armors', ()):
+            name = row[0]
+            armors[name.lower()] = Armor(*row[:7], tuple(row[7]), *row[8:], armor_skills.get(name, ()),
+                                         armor_materials.get(name, ()))
+
+        charms = collections.defaultdict(list)
+        for name, in sorted(tables.get('charms', ())):
+            charms[base_name(name, 'charm')].append(Charm(name, charm_skills.get(name, ()),
+                                                          charm_materials.get(name, ())))
+
+        items = frozenset(name for name, in tables.get('items', ()))
+
+        # The inverse of armor_materials and charm_materials, so finding what needs an item doesn't scan them.
+        material_uses = {name: ([], []) for name in items}
+        for index, table in enumerate(('armor_materials', 'charm_materials')):
+            for name, material, amount in tables.get(table, ()):
+                material_uses.setdefault(material, ([], []))[index].append((name, amount))
+
+        materials = {name.lower(): Material(name, tuple(sorted(armors)), tuple(sorted(charms)))
+                     for name, (armors, charms) in material_uses.items()}
+
+        weapons = {}
+        for row in tables.get('weapons', ()):
+            weapons[row[0].lower()] = Weapon(*row[:-1], tuple(row[-1]))
+
+        names = utils.NameTrie()
+        for table, mapping in (('armors', armors), ('skills', skills), ('items', materials), ('weapons', weapons)):
+            for key in mapping:
+                names.insert(key, table, key)
+
+        # Armor is often written with the first letter of its rank, e.g. kaiser crown b.
+        for key in armors:
+            rest, _, rank = key.rpartition(' ')
+            if rank in ('alpha', 'beta', 'gamma'):
+                names.insert(f'{rest} {rank[0]}', 'armors', key, alias=True)
+
+        # Charms and decorations are named with their suffix and resolve without it too.
+        for table, mapping, suffix in (('charms', charms, 'charm'), ('decorations', decorations, 'jewel')):
+            for key in mapping:
+                names.insert(f'{key} {suffix}', table, key)
+                names.insert(key, table, key, alias=True)
+
+        fuzzy = {
+            table: utils.TrigramIndex(name for name, *_ in tables.get(table, ()))
+            for table in ('skills', 'items', 'armors', 'charms', 'decorations', 'weapons')
+        }
+
+        object.__setattr__(self, 'skills', MappingProxyType(skills))
+        object.__setattr__(self, 'items', items)
+        object.__setattr__(self, 'armors', MappingProxyType(armors))
+        object.__setattr__(self, 'charms', MappingProxyType({name: tuple(levels) for name, levels in charms.items()}))
+        object.__setattr__(self, 'decorations', MappingProxyType(decorations))
+        object.__setattr__(self, 'weapons', MappingProxyType(weapons))
+        object.__setattr__(self, 'materials', MappingProxyType(materials))
+        object.__setattr__(self, 'names', names)
+        object.__setattr__(self, 'fuzzy', MappingProxyType(fuzzy))
+        object.__setattr__(self, 'armor_index', ArmorIndex(armors.values()))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{self.__class__.__name__} is read-only')
+
+    def __repr__(self):
+        return f'<Snapshot skills={len(self.skills)} armors={len(self.armors)} charms={len(self.charms)} ' \
+               f'decorations={len(self.decorations)} weapons={len(self.weapons)}>'
+
+    @classmethod
+    def from_files(cls, path='mhw'):
+        return cls(load_cached(path))
+
+    @classmethod
+    async def from_pool(cls, pool):
+        tables = {}
+        async with pool.acquire() as con:
+            # Tables created after the connection was opened are only prepared now.
+            await queries.prepare(con)
+
+            # Every table is read from the same snapshot, so an update committing halfway through isn't seen.
+            async with con.transaction(isolation='repeatable_read', readonly=True):
+                for _, _, names, _ in ENTITIES:
+                    for table in names:
+                        tables[table] = [tuple(r) for r in await queries.fetch(con, f'select_{table}')]
+
+        return cls(tables)
+
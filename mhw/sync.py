@@ -0,0 +1,144 @@
+import json
+import time
+import hashlib
+import collections
+
+from .tables import TABLES, ENTITIES, read_data, load_tables
+
+
+__all__ = ('Delta', 'diff_entities', 'fetch_state', 'apply_deltas')
+
+
+Delta = collections.namedtuple('Delta', 'kind filename file_hash tables hashes records inserted updated deleted')
+
+
+def get_hash(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def diff_entities(state, *, path='mhw', force=False):
+    """Compares the data files against the stored sync state.
+
+    The rows of load_tables are grouped by the entity they belong to, every
+    table of an entity has the entity's name as its first column. An entity
+    is hashed over its rows, so only changes to what is stored count.
+    """
+
+    changed = []
+    for entity in ENTITIES:
+        file_hash = get_hash(read_data(path, entity[1]))
+        if force or state.get(('file', entity[1])) != file_hash:
+            changed.append((entity, file_hash))
+
+    if not changed:
+        return []
+
+    rows = load_tables(path)
+    deltas = []
+    for (kind, filename, tables, _), file_hash in changed:
+        entities = collections.defaultdict(lambda: {table: [] for table in tables})
+        for table in tables:
+            for row in rows.get(table, ()):
+                entities[row[0]][table].append(row)
+
+        entity_hashes = {
+            name: get_hash(json.dumps([sorted(entity[table]) for table in tables]).encode())
+            for name, entity in entities.items()
+        }
+        stored = {key: value for (k, key), value in state.items() if k == kind}
+
+        inserted = sorted(name for name in entities if name not in stored)
+        updated = sorted(name for name, entity_hash in entity_hashes.items()
+                         if name in stored and (force or stored[name] != entity_hash))
+        deleted = sorted(name for name in stored if name not in entities)
+
+        hashes = {name: entity_hashes[name] for name in inserted + updated}
+        records = {table: [row for name in hashes for row in entities[name][table]] for table in tables}
+
+        deltas.append(Delta(kind, filename, file_hash, tables, hashes, records, inserted, updated, deleted))
+
+    return deltas
+
+
+async def copy_table(con, table, records):
+    columns, key = TABLES[table]
+    staging = f'staging_{table}'
+    column_list = ', '.join(columns)
+
+    query = f"""
+            CREATE TEMPORARY TABLE {staging}
+            (LIKE world.{table} INCLUDING DEFAULTS)
+            ON COMMIT DROP;
+            """
+
+    await con.execute(query)
+    await con.copy_records_to_table(staging, records=records, columns=columns)
+
+    updates = ', '.join(f'{column} = excluded.{column}' for column in columns if column not in key)
+    action = f'DO UPDATE SET {updates}' if updates else 'DO NOTHING'
+
+    query = f"""
+            INSERT INTO world.{table} ({column_list})
+            SELECT {column_list}
+            FROM {staging}
+            ON CONFLICT ({', '.join(key)})
+            {action};
+            """
+
+    await con.execute(query)
+
+
+async def fetch_state(con):
+    query = """
+            SELECT kind, key, hash
+            FROM world.sync_state;
+            """
+
+    return {(kind, key): value for kind, key, value in await con.fetch(query)}
+
+
+async def apply_deltas(pool, deltas):
+    """Writes the deltas to the world schema in one transaction.
+
+    Returns the table, row count and time taken of every table written.
+    """
+
+    timings = []
+
+    async with pool.acquire() as con:
+        async with con.transaction():
+            # The rows of changed entities are written again, nothing references them.
+            for delta in deltas:
+                stale = delta.updated + delta.deleted
+                for table in delta.tables[1:] if stale else ():
+                    await con.execute(f'DELETE FROM world.{table} WHERE name = ANY($1::text[]);', stale)
+
+            for delta in deltas:
+                for table in delta.tables:
+                    records = delta.records[table]
+                    if not records:
+                        continue
+
+                    start = time.perf_counter()
+                    await copy_table(con, table, records)
+                    timings.append((table, len(records), time.perf_counter() - start))
+
+            # Removed entities go last and in reverse, once the rows that referenced them were updated,
+            # e.g. a renamed skill is only deleted after the decorations were moved to the new name.
+            for delta in reversed(deltas):
+                if delta.deleted:
+                    await con.execute(f'DELETE FROM world.{delta.tables[0]} WHERE name = ANY($1::text[]);',
+                                      delta.deleted)
+
+            query = """
+                    DELETE FROM world.sync_state
+                    WHERE kind = $1 AND key = ANY($2::text[]);
+                    """
+
+            await con.executemany(query, [(delta.kind, delta.deleted) for delta in deltas])
+
+            records = [('file', delta.filename, delta.file_hash) for delta in deltas]
+            records.extend((delta.kind, name, value) for delta in deltas for name, value in delta.hashes.items())
+            await copy_table(con, 'sync_state', records)
+
+    return timings
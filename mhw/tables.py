@@ -0,0 +1,167 @@
+import os
+import json
+import pickle
+import tempfile
+
+
+__all__ = ('TABLES', 'ENTITIES', 'load_tables', 'load_cached')
+
+
+TABLES = {
+    'skills': (('name', 'description'), ('name',)),
+    'skill_levels': (('name', 'level', 'effect'), ('name', 'level')),
+    'items': (('name',), ('name',)),
+    'armors': (('name', 'rarity', 'price', 'part', 'min_def', 'max_def', 'slots', 'slot_levels', 'sex', 'fire_res',
+                'water_res', 'thunder_res', 'ice_res', 'dragon_res'), ('name',)),
+    'armor_skills': (('name', 'skill', 'level'), ('name', 'skill')),
+    'armor_materials': (('name', 'material', 'amount'), ('name', 'material')),
+    'charms': (('name',), ('name',)),
+    'charm_skills': (('name', 'skill', 'level'), ('name', 'skill')),
+    'charm_materials': (('name', 'material', 'amount'), ('name', 'material')),
+    'decorations': (('name', 'slot_level', 'rarity', 'skill'), ('name',)),
+    'weapons': (('name', 'type', 'rarity', 'attack', 'affinity', 'element', 'element_attack', 'sharpness'),
+                ('name',)),
+    'sync_state': (('kind', 'key', 'hash'), ('kind', 'key')),
+}
+
+
+def skill_rows(skill):
+    yield 'skills', (skill['Name'], skill['Description'])
+
+    for level, effect in enumerate(skill.get('Levels', ()), 1):
+        yield 'skill_levels', (skill['Name'], level, effect)
+
+
+def item_rows(item):
+    yield 'items', (item,)
+
+
+def armor_rows(armor):
+    yield 'armors', (armor['Name'], armor['Rarity'], armor['Price'], armor['Part'], armor['Min Def'],
+                     armor['Max Def'], armor['Slots'], armor['Slot Levels'], armor['Sex'], armor['Fire Resistance'],
+                     armor['Water Resistance'], armor['Thunder Resistance'], armor['Ice Resistance'],
+                     armor['Dragon Resistance'])
+
+    for skill in armor['Skills']:
+        yield 'armor_skills', (armor['Name'], skill['Name'], skill['Level'])
+
+    for material in armor['Materials']:
+        yield 'armor_materials', (armor['Name'], material['Name'], material['Amount'])
+
+
+def charm_rows(charm):
+    yield 'charms', (charm['Name'],)
+
+    for skill in charm['Skills']:
+        yield 'charm_skills', (charm['Name'], skill['Name'], skill['Level'])
+
+    for material in charm.get('Materials', ()):
+        yield 'charm_materials', (charm['Name'], material['Name'], material['Amount'])
+
+
+def decoration_rows(decoration):
+    yield 'decorations', (decoration['Name'], decoration['Slot Level'], decoration['Rarity'], decoration['Skill'])
+
+
+def weapon_rows(weapon):
+    element = weapon.get('Element') or {}
+    yield 'weapons', (weapon['Name'], weapon['Type'].lower(), weapon['Rarity'], weapon['Attack'],
+                      weapon.get('Affinity', 0), element.get('Type'), element.get('Attack'), weapon['Sharpness'])
+
+
+# The order matters, entities may only reference the ones listed before them.
+ENTITIES = (
+    ('skill', 'skills.json', ('skills', 'skill_levels'), skill_rows),
+    ('item', 'items.json', ('items',), item_rows),
+    ('armor', 'armor.json', ('armors', 'armor_skills', 'armor_materials'), armor_rows),
+    ('charm', 'charms.json', ('charms', 'charm_skills', 'charm_materials'), charm_rows),
+    ('decoration', 'decorations.json', ('decorations',), decoration_rows),
+    ('weapon', 'weapons.json', ('weapons',), weapon_rows),
+)
+
+# Data files a data directory may leave out, they are read as an empty list.
+OPTIONAL_FILES = frozenset({'weapons.json'})
+
+
+def read_data(path, filename):
+    try:
+        with open(os.path.join(path, filename), 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        if filename not in OPTIONAL_FILES:
+            raise
+
+        return b'[]'
+
+
+def load_tables(path='mhw'):
+    """Reads the data files into rows for every table in the world schema.
+
+    Rows are keyed on the table's primary key so that duplicate entries
+    in the source files resolve to the last one, like sequential upserts would.
+    """
+
+    tables = {}
+    for _, filename, _, get_rows in ENTITIES:
+        for entry in json.loads(read_data(path, filename)):
+            for table, row in get_rows(entry):
+                key = TABLES[table][1]
+                tables.setdefault(table, {})[row[:len(key)]] = row
+
+    return {table: list(rows.values()) for table, rows in tables.items()}
+
+
+# Bump when the rows produced by load_tables change shape so stale caches are rebuilt.
+CACHE_VERSION = 3
+
+
+def file_key(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_cached(path='mhw', cache='tables.pickle'):
+    """load_tables backed by a pickle of the rows.
+
+    The pickle starts with a header of the cache format and the modification
+    time and size of every data file, and is rebuilt whenever one of them
+    changes. The rows are only unpickled once the header matches, and a cache
+    that can't be read for any reason is treated as missing.
+    """
+
+    key = ('mhw.tables', CACHE_VERSION,
+           tuple(file_key(os.path.join(path, filename)) for _, filename, _, _ in ENTITIES))
+    cache = os.path.join(path, cache)
+
+    try:
+        with open(cache, 'rb') as f:
+            if pickle.load(f) == key:
+                return pickle.load(f)
+    except Exception:
+        pass
+
+    tables = load_tables(path)
+
+    # Every process writes its own temporary file, so workers starting together don't write over each other.
+    try:
+        temp = tempfile.NamedTemporaryFile(dir=path, prefix=f'{os.path.basename(cache)}.', suffix='.tmp',
+                                           delete=False)
+    except OSError:
+        return tables
+
+    try:
+        with temp:
+            pickle.dump(key, temp, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(tables, temp, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp.name, cache)
+    except OSError:
+        try:
+            os.remove(temp.name)
+        except OSError:
+            pass
+
+    return tables
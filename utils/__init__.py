@@ -1,3 +1,15 @@
 from .formats import *
 from .misc import *
 from .converters import *
+from .fuzzy import *
+from .cache import *
+from .executor import *
+from .stats import *
+from .context import *
+from .queries import *
+from .supervisor import *
+from .limits import *
+from .paginator import *
+from .watcher import *
+from .trie import *
+from .git import *
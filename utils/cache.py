@@ -0,0 +1,55 @@
+import time
+import collections
+
+
+__all__ = ('LRUCache',)
+
+
+class LRUCache:
+    """A cache holding at most maxsize entries, evicting the least recently used.
+
+    If ttl is given, entries expire that many seconds after being set.
+    """
+
+    def __init__(self, maxsize=128, *, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = collections.OrderedDict()
+
+    def __repr__(self):
+        return f'<LRUCache size={len(self)}/{self.maxsize} hits={self.hits} misses={self.misses}>'
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __setitem__(self, key, value):
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        self._data[key] = (expires, value)
+        self._data.move_to_end(key)
+
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get(self, key, default=None):
+        try:
+            expires, value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+
+        if expires is not None and expires < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def clear(self):
+        self._data.clear()
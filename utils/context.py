@@ -0,0 +1,28 @@
+import time
+
+from discord.ext import commands
+
+
+__all__ = ('Context',)
+
+
+class Context(commands.Context):
+    @property
+    def stats_key(self):
+        return self.command.qualified_name if self.command is not None else None
+
+    def timer(self, phase):
+        """Times the body of a with statement as a phase of the current command."""
+
+        return self.bot.stats.timer(self.stats_key, phase)
+
+    def increment(self, counter, amount=1):
+        self.bot.stats.increment(self.stats_key, counter, amount)
+
+    async def send(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await super().send(*args, **kwargs)
+        finally:
+            if self.command is not None:
+                self.bot.stats.observe(self.stats_key, 'send', time.perf_counter() - start)
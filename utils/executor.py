@@ -0,0 +1,105 @@
+import os
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+
+__all__ = ('PoolStats', 'Executor')
+
+
+def _timed(func, args, kwargs):
+    return time.time(), func(*args, **kwargs)
+
+
+class PoolStats:
+    __slots__ = ('workers', 'submitted', 'completed', 'failed', 'pending', 'wait_time', 'max_wait_time', 'run_time')
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.pending = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.run_time = 0.0
+
+    @property
+    def queued(self):
+        """An estimate of the jobs waiting for a worker."""
+
+        return max(0, self.pending - self.workers)
+
+    def to_dict(self):
+        done = self.completed or 1
+        return {
+            'workers': self.workers,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'pending': self.pending,
+            'queued': self.queued,
+            'average_wait': self.wait_time / done,
+            'max_wait': self.max_wait_time,
+            'average_run': self.run_time / done,
+        }
+
+
+class Executor:
+    """Runs work off the event loop.
+
+    CPU bound work goes to a process pool and blocking I/O to a thread pool.
+    Every bot process has its own executor, so the process pool is kept
+    small unless processes asks for more.
+    """
+
+    def __init__(self, *, processes=None, threads=None):
+        processes = processes or 2
+        threads = threads or min(32, (os.cpu_count() or 1) + 4)
+
+        self.process_pool = ProcessPoolExecutor(max_workers=processes)
+        self.thread_pool = ThreadPoolExecutor(max_workers=threads)
+        self.stats = {
+            'process': PoolStats(processes),
+            'thread': PoolStats(threads),
+        }
+
+    def __repr__(self):
+        return f'<Executor process={self.stats["process"].to_dict()} thread={self.stats["thread"].to_dict()}>'
+
+    async def _run(self, kind, job, *args):
+        pool = self.process_pool if kind == 'process' else self.thread_pool
+        stats = self.stats[kind]
+        loop = asyncio.get_event_loop()
+
+        stats.submitted += 1
+        stats.pending += 1
+        submitted = time.time()
+        try:
+            started, result = await loop.run_in_executor(pool, job, *args)
+        except Exception:
+            stats.failed += 1
+            raise
+        finally:
+            stats.pending -= 1
+
+        wait = max(0.0, started - submitted)
+        stats.completed += 1
+        stats.wait_time += wait
+        stats.max_wait_time = max(stats.max_wait_time, wait)
+        stats.run_time += time.time() - started
+        return result
+
+    async def run_in_process(self, func, *args, **kwargs):
+        """Runs a picklable function in the process pool."""
+
+        return await self._run('process', _timed, func, args, kwargs)
+
+    async def run_in_thread(self, func, *args, **kwargs):
+        """Runs a function in the thread pool."""
+
+        return await self._run('thread', _timed, func, args, kwargs)
+
+    def shutdown(self, wait=True):
+        self.process_pool.shutdown(wait=wait)
+        self.thread_pool.shutdown(wait=wait)
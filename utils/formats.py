@@ -3,41 +3,65 @@ __all__ = ('TabularData',)
 
 class TabularData:
     def __init__(self):
-        self._widths = []
         self._columns = []
         self._rows = []
 
     def set_columns(self, columns):
-        self._columns = columns
-        self._widths = [len(c) + 2 for c in columns]
+        self._columns = [str(c) for c in columns]
 
     def add_row(self, row):
-        rows = [str(r) for r in row]
-        self._rows.append(rows)
-        for index, element in enumerate(rows):
-            width = len(element) + 2
-            if width > self._widths[index]:
-                self._widths[index] = width
+        self._rows.append([str(r) for r in row])
 
     def add_rows(self, rows):
         for row in rows:
             self.add_row(row)
 
-    def render(self):
-        sep = '+'.join('-' * w for w in self._widths)
-        sep = f'+{sep}+'
+    def get_widths(self):
+        return [max(map(len, column)) + 2 for column in zip(self._columns, *self._rows)]
 
-        to_draw = [sep]
+    def render_lines(self):
+        """Lazily yields the lines of the rendered table."""
+
+        widths = self.get_widths()
+        sep = '+'.join('-' * w for w in widths)
+        sep = f'+{sep}+'
 
-        def get_entry(d):
-            elem = '|'.join(f'{e:^{self._widths[i]}}' for i, e in enumerate(d))
-            return f'|{elem}|'
+        entry = '|'.join(f'{{:^{w}}}' for w in widths)
+        entry = f'|{entry}|'
 
-        to_draw.append(get_entry(self._columns))
-        to_draw.append(sep)
+        yield sep
+        yield entry.format(*self._columns)
+        yield sep
 
         for row in self._rows:
-            to_draw.append(get_entry(row))
+            yield entry.format(*row)
+
+        yield sep
+
+    def render(self):
+        return '\n'.join(self.render_lines())
+
+    def paginate(self, *, max_size=2000, prefix='```', suffix='```'):
+        """Lazily yields the rendered table split into pages of at most max_size characters.
+
+        Every page is wrapped in prefix and suffix on their own lines.
+        """
+
+        size = len(prefix) + len(suffix) + 2
+        page = []
+        length = size
+
+        for line in self.render_lines():
+            if size + len(line) > max_size:
+                raise RuntimeError(f'Line exceeds maximum page size {max_size - size}')
+
+            if length + len(line) > max_size:
+                yield '\n'.join((prefix, *page, suffix))
+                page = []
+                length = size
+
+            page.append(line)
+            length += len(line) + 1
 
-        to_draw.append(sep)
-        return '\n'.join(to_draw)
+        if page:
+            yield '\n'.join((prefix, *page, suffix))
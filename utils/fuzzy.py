@@ -0,0 +1,75 @@
+import re
+import heapq
+import collections
+
+
+__all__ = ('trigrams', 'similarity', 'TrigramIndex')
+
+
+_word_re = re.compile(r'[^\W_]+')
+
+
+def trigrams(text):
+    """Returns the set of trigrams of a string the same way pg_trgm does.
+
+    Every alphanumeric word is lowercased and padded with two spaces in
+    front and one at the end before being split up.
+    """
+
+    grams = set()
+    for word in _word_re.findall(text.lower()):
+        word = f'  {word} '
+        grams.update(word[i:i + 3] for i in range(len(word) - 2))
+
+    return grams
+
+
+def similarity(first, second):
+    first, second = trigrams(first), trigrams(second)
+    if not first or not second:
+        return 0.0
+
+    shared = len(first & second)
+    return shared / (len(first) + len(second) - shared)
+
+
+class TrigramIndex:
+    """An inverted trigram index over a fixed set of names.
+
+    Scores match pg_trgm's SIMILARITY, names scoring below the threshold
+    are never returned.
+    """
+
+    def __init__(self, names, *, threshold=0.3):
+        self.threshold = threshold
+        self._names = []
+        self._sizes = []
+        self._index = collections.defaultdict(list)
+
+        for name in names:
+            grams = trigrams(name)
+            for gram in grams:
+                self._index[gram].append(len(self._names))
+
+            self._names.append(name)
+            self._sizes.append(len(grams))
+
+    def __len__(self):
+        return len(self._names)
+
+    def search(self, query, *, limit=10):
+        """Returns up to limit (name, score) pairs ordered by score."""
+
+        grams = trigrams(query)
+        counts = collections.Counter()
+        for gram in grams:
+            counts.update(self._index.get(gram, ()))
+
+        size = len(grams)
+        results = []
+        for index, shared in counts.items():
+            score = shared / (size + self._sizes[index] - shared)
+            if score >= self.threshold:
+                results.append((-score, self._names[index]))
+
+        return [(name, -score) for score, name in heapq.nsmallest(limit, results)]
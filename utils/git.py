@@ -0,0 +1,113 @@
+import os
+import re
+import configparser
+
+
+__all__ = ('Repository',)
+
+
+_scp_re = re.compile(r'(?:[\w.-]+@)?(?P<host>[\w.-]+):(?P<path>[^/].*)')
+
+
+def web_url(remote):
+    """Turns a remote url such as git@github.com:user/repo.git into https://github.com/user/repo."""
+
+    if '://' not in remote:
+        match = _scp_re.fullmatch(remote)
+        if match is not None:
+            remote = f'https://{match.group("host")}/{match.group("path")}'
+
+    remote = re.sub(r'^(?:git|ssh|https?)://(?:[^@/]+@)?', 'https://', remote)
+    if remote.endswith('.git'):
+        remote = remote[:-4]
+
+    return remote.rstrip('/')
+
+
+class Repository:
+    """The commit and origin url of a git checkout, read from its .git directory instead of running git.
+
+    Both are read once, refresh reads them again e.g. after a pull.
+    """
+
+    def __init__(self, path='.', *, remote='origin'):
+        self.path = path
+        self.remote = remote
+        self.url = None
+        self.commit = None
+        self.refresh()
+
+    def __repr__(self):
+        return f'<Repository url={self.url!r} commit={self.commit!r}>'
+
+    def refresh(self):
+        git_dir = self.git_dir()
+        if git_dir is None:
+            self.url = self.commit = None
+            return
+
+        # A worktree keeps its config and branches in the directory of the main checkout.
+        directories = [git_dir]
+        try:
+            with open(os.path.join(git_dir, 'commondir')) as f:
+                directories.append(os.path.join(git_dir, f.read().strip()))
+        except OSError:
+            pass
+
+        self.url = self.read_url(directories[-1])
+        self.commit = self.read_commit(directories)
+
+    def git_dir(self):
+        git_dir = os.path.join(self.path, '.git')
+
+        # Worktrees and submodules have a file pointing to the real directory.
+        if os.path.isfile(git_dir):
+            with open(git_dir) as f:
+                content = f.read().strip()
+
+            if not content.startswith('gitdir:'):
+                return None
+
+            git_dir = os.path.join(self.path, content[len('gitdir:'):].strip())
+
+        return git_dir if os.path.isdir(git_dir) else None
+
+    def read_url(self, git_dir):
+        parser = configparser.ConfigParser(strict=False, interpolation=None)
+        try:
+            parser.read(os.path.join(git_dir, 'config'))
+        except configparser.Error:
+            return None
+
+        url = parser.get(f'remote "{self.remote}"', 'url', fallback=None)
+        return web_url(url) if url else None
+
+    def read_commit(self, directories):
+        try:
+            with open(os.path.join(directories[0], 'HEAD')) as f:
+                head = f.read().strip()
+        except OSError:
+            return None
+
+        if not head.startswith('ref:'):
+            return head
+
+        ref = head[len('ref:'):].strip()
+        for directory in directories:
+            try:
+                with open(os.path.join(directory, ref)) as f:
+                    return f.read().strip()
+            except OSError:
+                pass
+
+            # Refs that haven't changed since the last gc are only in packed-refs.
+            try:
+                with open(os.path.join(directory, 'packed-refs')) as f:
+                    for line in f:
+                        commit, _, name = line.strip().partition(' ')
+                        if name == ref:
+                            return commit
+            except OSError:
+                pass
+
+        return None
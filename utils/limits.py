@@ -0,0 +1,126 @@
+import time
+import asyncio
+
+from discord.ext import commands
+
+
+__all__ = ('SingleFlight', 'TokenBucket', 'Throttled', 'RateLimiter')
+
+
+class SingleFlight:
+    """Shares one running task between concurrent calls with the same key.
+
+    The task is shielded so a caller being cancelled does not cancel it
+    for the others waiting on it.
+    """
+
+    def __init__(self):
+        self.tasks = {}
+        self.coalesced = 0
+
+    def __contains__(self, key):
+        return key in self.tasks
+
+    async def do(self, key, func, *args, **kwargs):
+        task = self.tasks.get(key)
+        if task is None:
+            task = self.tasks[key] = asyncio.ensure_future(func(*args, **kwargs))
+            task.add_done_callback(lambda _: self.tasks.pop(key, None))
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
+
+
+class TokenBucket:
+    __slots__ = ('rate', 'per', 'tokens', 'updated', 'warned')
+
+    def __init__(self, rate, per):
+        self.rate = rate
+        self.per = per
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.warned = False
+
+    def refill(self, now):
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate / self.per)
+        self.updated = now
+
+    def retry_after(self):
+        return (1 - self.tokens) * self.per / self.rate
+
+
+class Throttled(commands.CommandError):
+    def __init__(self, scope, retry_after, first):
+        self.scope = scope
+        self.retry_after = retry_after
+        self.first = first
+        super().__init__(f'Rate limited per {scope}, retry in {retry_after:.1f}s.')
+
+
+class RateLimiter:
+    """Token buckets per user, channel and guild.
+
+    limits maps a scope to the number of commands allowed and the period in
+    seconds they refill over. A command takes a token from each of its
+    buckets and is rejected if any of them is empty.
+    """
+
+    DEFAULTS = {
+        'user': (5, 10.0),
+        'channel': (10, 10.0),
+        'guild': (20, 10.0),
+    }
+
+    def __init__(self, limits=None):
+        self.limits = dict(self.DEFAULTS if limits is None else limits)
+        self.buckets = {}
+        self.throttled = 0
+        self._pruned = time.monotonic()
+
+    def keys(self, ctx):
+        ids = {
+            'user': ctx.author.id,
+            'channel': ctx.channel.id,
+            'guild': ctx.guild.id if ctx.guild is not None else None,
+        }
+        return [(scope, ids[scope]) for scope in self.limits if ids.get(scope) is not None]
+
+    def acquire(self, ctx):
+        """Takes a token from every bucket of the context, raising Throttled if one is empty."""
+
+        now = time.monotonic()
+        self.prune(now)
+
+        buckets = []
+        for scope, id in self.keys(ctx):
+            bucket = self.buckets.get((scope, id))
+            if bucket is None:
+                bucket = self.buckets[scope, id] = TokenBucket(*self.limits[scope])
+            else:
+                bucket.refill(now)
+
+            if bucket.tokens < 1:
+                self.throttled += 1
+                first, bucket.warned = not bucket.warned, True
+                raise Throttled(scope, bucket.retry_after(), first)
+
+            buckets.append(bucket)
+
+        for bucket in buckets:
+            bucket.tokens -= 1
+            bucket.warned = False
+
+        return True
+
+    def prune(self, now):
+        """Drops the buckets that have refilled completely, at most once per longest period."""
+
+        period = max((per for _, per in self.limits.values()), default=0)
+        if now - self._pruned < period:
+            return
+
+        self._pruned = now
+        for key, bucket in list(self.buckets.items()):
+            if now - bucket.updated >= bucket.per:
+                del self.buckets[key]
@@ -0,0 +1,119 @@
+import copy
+import asyncio
+
+import discord
+
+
+__all__ = ('Pages',)
+
+
+class Pages:
+    """Shows pages one at a time in a single message that is edited on navigation.
+
+    get_page is called with the index of a page the first time it is shown
+    and returns its content, either a string or an embed. With more than one
+    page the page number is added as the footer of embeds and after strings,
+    which should leave room for up to 20 characters.
+
+    Navigation reactions are added and listened to in the background, so
+    the command finishes once the first page is sent. Reactions are removed
+    after each page turn when the bot can manage messages. Otherwise
+    removing a reaction turns the page too, so every press counts.
+    """
+
+    FIRST = '\N{BLACK LEFT-POINTING DOUBLE TRIANGLE WITH VERTICAL BAR}'
+    PREVIOUS = '\N{BLACK LEFT-POINTING TRIANGLE}'
+    NEXT = '\N{BLACK RIGHT-POINTING TRIANGLE}'
+    LAST = '\N{BLACK RIGHT-POINTING DOUBLE TRIANGLE WITH VERTICAL BAR}'
+    STOP = '\N{BLACK SQUARE FOR STOP}'
+
+    def __init__(self, ctx, get_page, count, *, start=0, timeout=120.0):
+        self.ctx = ctx
+        self.get_page = get_page
+        self.count = count
+        self.index = min(max(start, 0), count - 1)
+        self.timeout = timeout
+        self.pages = {}
+        self.message = None
+
+        # Jumping to the ends is only worth a reaction when there are a few pages to skip.
+        if count > 3:
+            self.emojis = (self.FIRST, self.PREVIOUS, self.NEXT, self.LAST, self.STOP)
+        else:
+            self.emojis = (self.PREVIOUS, self.NEXT, self.STOP)
+
+    def render(self, index):
+        page = self.pages.get(index)
+        if page is None:
+            page = self.pages[index] = self.get_page(index)
+            if self.count > 1:
+                number = f'Page {index + 1}/{self.count}'
+                if isinstance(page, str):
+                    page = self.pages[index] = f'{page}\n{number}'
+                else:
+                    # get_page may return a cached embed, which should not keep the footer.
+                    page = self.pages[index] = copy.copy(page)
+                    page.set_footer(text=number)
+
+        return {'content': page} if isinstance(page, str) else {'embed': page}
+
+    async def send(self):
+        self.message = await self.ctx.send(**self.render(self.index))
+        if self.count > 1:
+            self.ctx.bot.loop.create_task(self.navigate())
+
+        return self.message
+
+    async def navigate(self):
+        try:
+            for emoji in self.emojis:
+                await self.message.add_reaction(emoji)
+        except discord.HTTPException:
+            return
+
+        def check(reaction, user):
+            return reaction.message.id == self.message.id and user.id == self.ctx.author.id and \
+                str(reaction.emoji) in self.emojis
+
+        # Removing the user's reaction dispatches reaction_remove as well, which would turn the page twice.
+        can_remove = self.ctx.guild is not None and self.ctx.channel.permissions_for(self.ctx.me).manage_messages
+        events = ('reaction_add',) if can_remove else ('reaction_add', 'reaction_remove')
+
+        while True:
+            waiters = [self.ctx.bot.loop.create_task(self.ctx.bot.wait_for(event, check=check)) for event in events]
+            done, pending = await asyncio.wait(waiters, timeout=self.timeout, return_when=asyncio.FIRST_COMPLETED)
+            for waiter in pending:
+                waiter.cancel()
+
+            if not done:
+                break
+
+            reaction, user = done.pop().result()
+            emoji = str(reaction.emoji)
+            if emoji == self.STOP:
+                break
+
+            index = {
+                self.FIRST: 0,
+                self.PREVIOUS: self.index - 1,
+                self.NEXT: self.index + 1,
+                self.LAST: self.count - 1,
+            }[emoji]
+
+            if can_remove:
+                try:
+                    await self.message.remove_reaction(reaction.emoji, user)
+                except discord.HTTPException:
+                    pass
+
+            if 0 <= index < self.count and index != self.index:
+                self.index = index
+                try:
+                    await self.message.edit(**self.render(index))
+                except discord.HTTPException:
+                    return
+
+        try:
+            await self.message.clear_reactions()
+        except discord.HTTPException:
+            pass
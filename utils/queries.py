@@ -0,0 +1,38 @@
+import asyncpg
+
+
+__all__ = ('QueryRegistry',)
+
+
+class QueryRegistry:
+    """Named queries prepared once per connection.
+
+    prepare runs PREPARE for every query the connection doesn't have yet and
+    is meant to be the init hook of a pool. The statements are kept by the
+    server session, so they live across pool acquires, unlike asyncpg's
+    PreparedStatement objects, and go away with the connection. fetch runs
+    EXECUTE on them, so the queries are planned once per connection.
+    """
+
+    def __init__(self):
+        self.queries = {}
+
+    def register(self, name, query):
+        self.queries[name] = query
+        return name
+
+    async def prepare(self, con):
+        """Prepares the missing queries, those that fail, e.g. as their tables don't exist yet, are skipped."""
+
+        prepared = {name for name, in await con.fetch('SELECT name FROM pg_prepared_statements;')}
+        for name, query in self.queries.items():
+            if name in prepared:
+                continue
+
+            try:
+                await con.execute(f'PREPARE {name} AS {query}')
+            except asyncpg.PostgresError:
+                pass
+
+    async def fetch(self, con, name):
+        return await con.fetch(f'EXECUTE {name};')
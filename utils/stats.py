@@ -0,0 +1,137 @@
+import os
+import json
+import time
+import bisect
+import collections
+from contextlib import contextmanager
+
+
+__all__ = ('Histogram', 'CommandStats', 'Stats')
+
+
+class Histogram:
+    """A fixed bucket histogram of durations in seconds."""
+
+    BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+               10.0, float('inf'))
+
+    __slots__ = ('counts', 'count', 'sum', 'max')
+
+    def __init__(self):
+        self.counts = [0] * len(self.BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def average(self):
+        return self.sum / self.count if self.count else 0.0
+
+    def percentile(self, percent):
+        """Returns the upper bound of the bucket holding the given percentile."""
+
+        if not self.count:
+            return 0.0
+
+        rank = self.count * percent / 100
+        seen = 0
+        for bound, count in zip(self.BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'max': self.max,
+            'buckets': {str(bound): count for bound, count in zip(self.BUCKETS, self.counts)},
+        }
+
+
+class CommandStats:
+    __slots__ = ('timings', 'counters')
+
+    def __init__(self):
+        self.timings = collections.defaultdict(Histogram)
+        self.counters = collections.Counter()
+
+    def to_dict(self):
+        return {
+            'timings': {phase: histogram.to_dict() for phase, histogram in self.timings.items()},
+            'counters': dict(self.counters),
+        }
+
+
+class Stats:
+    """Timings and counters per command.
+
+    Timings are kept per phase of a command, such as total, db, render and send.
+    """
+
+    def __init__(self):
+        self.commands = collections.defaultdict(CommandStats)
+        self.started = time.time()
+
+    def observe(self, command, phase, seconds):
+        self.commands[command].timings[phase].observe(seconds)
+
+    def increment(self, command, counter, amount=1):
+        self.commands[command].counters[counter] += amount
+
+    @contextmanager
+    def timer(self, command, phase):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(command, phase, time.perf_counter() - start)
+
+    def to_dict(self):
+        return {
+            'started': self.started,
+            'commands': {command: stats.to_dict() for command, stats in self.commands.items()},
+        }
+
+    def to_prometheus(self, prefix='mhw'):
+        lines = [f'# TYPE {prefix}_command_seconds histogram']
+        for command, stats in self.commands.items():
+            for phase, histogram in stats.timings.items():
+                labels = f'command="{command}",phase="{phase}"'
+                seen = 0
+                for bound, count in zip(histogram.BUCKETS, histogram.counts):
+                    seen += count
+                    le = '+Inf' if bound == float('inf') else bound
+                    lines.append(f'{prefix}_command_seconds_bucket{{{labels},le="{le}"}} {seen}')
+                lines.append(f'{prefix}_command_seconds_sum{{{labels}}} {histogram.sum}')
+                lines.append(f'{prefix}_command_seconds_count{{{labels}}} {histogram.count}')
+
+        lines.append(f'# TYPE {prefix}_command_events_total counter')
+        for command, stats in self.commands.items():
+            for counter, value in stats.counters.items():
+                lines.append(f'{prefix}_command_events_total{{command="{command}",event="{counter}"}} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path):
+        """Atomically writes the stats to a file, as JSON if it ends in .json and Prometheus text otherwise."""
+
+        if path.endswith('.json'):
+            content = json.dumps(self.to_dict(), indent=2)
+        else:
+            content = self.to_prometheus()
+
+        temp = f'{path}.tmp'
+        with open(temp, 'w') as f:
+            f.write(content)
+
+        os.replace(temp, path)
@@ -0,0 +1,169 @@
+import os
+import json
+import time
+import queue
+import collections
+import multiprocessing
+
+
+__all__ = ('Supervisor',)
+
+
+class Supervisor:
+    """Runs worker processes and restarts them when they exit or stop reporting their health.
+
+    target is called in each worker as target(*args, worker, health) where args
+    are the worker's entry in workers and health is a queue the worker puts
+    dicts with its health on, at least every interval seconds.
+
+    A worker that fails before reporting or within timeout seconds of starting
+    is restarted after a delay doubling from interval up to max_backoff, and
+    given up on after max_failures such failures in a row. The supervisor
+    exits once it gave up on every worker.
+    """
+
+    def __init__(self, target, workers, *, interval=30.0, timeout=None, health_file=None, max_failures=5,
+                 max_backoff=600.0):
+        self.target = target
+        self.workers = list(workers)
+        self.interval = interval
+        self.timeout = timeout or interval * 3
+        self.health_file = health_file
+        self.max_failures = max_failures
+        self.max_backoff = max_backoff
+        self.queue = multiprocessing.Queue()
+        self.processes = {}
+        self.started = {}
+        self.health = {}
+        self.restarts = collections.Counter()
+        self.failures = collections.Counter()
+        self.retry_at = {}
+        self.given_up = set()
+
+    def start(self, worker):
+        process = multiprocessing.Process(target=self.target, args=(*self.workers[worker], worker, self.queue),
+                                          name=f'worker-{worker}')
+        process.start()
+        self.processes[worker] = process
+        self.started[worker] = time.time()
+        self.health.pop(worker, None)
+
+    def stop(self, worker):
+        process = self.processes[worker]
+        process.terminate()
+        process.join(10)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+    def run(self):
+        for worker in range(len(self.workers)):
+            self.start(worker)
+
+        try:
+            while len(self.given_up) < len(self.workers):
+                self.poll(self.interval)
+                self.check()
+                self.report()
+        except KeyboardInterrupt:
+            return
+        finally:
+            for worker in self.processes:
+                self.stop(worker)
+
+        raise SystemExit('Every worker kept failing on startup, giving up.')
+
+    def poll(self, timeout):
+        """Collects the health reports sent in the next timeout seconds."""
+
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+
+            try:
+                report = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                return
+
+            report['received'] = time.time()
+            self.health[report['worker']] = report
+
+    def check(self):
+        now = time.time()
+        for worker, process in self.processes.items():
+            if worker in self.given_up:
+                continue
+
+            if worker in self.retry_at:
+                if now >= self.retry_at[worker]:
+                    del self.retry_at[worker]
+                    self.restart(worker)
+                continue
+
+            if not process.is_alive():
+                print(f'Worker {worker} exited with code {process.exitcode}.')
+            else:
+                last = self.health.get(worker, {}).get('received', self.started[worker])
+                if now - last < self.timeout:
+                    continue
+
+                print(f'Worker {worker} has not reported for {now - last:.0f}s.')
+                self.stop(worker)
+
+            self.failed(worker, now)
+
+    def failed(self, worker, now):
+        """Restarts a worker that stopped, after a backoff if it failed on startup or gives up after too many."""
+
+        if worker in self.health and now - self.started[worker] >= self.timeout:
+            self.failures[worker] = 0
+            print(f'Restarting worker {worker}.')
+            return self.restart(worker)
+
+        self.failures[worker] += 1
+        if self.failures[worker] >= self.max_failures:
+            print(f'Worker {worker} failed on startup {self.failures[worker]} times in a row, giving up on it.')
+            self.given_up.add(worker)
+            return
+
+        delay = min(self.interval * 2 ** (self.failures[worker] - 1), self.max_backoff)
+        print(f'Worker {worker} failed on startup, restarting in {delay:.0f}s.')
+        self.retry_at[worker] = now + delay
+
+    def restart(self, worker):
+        self.restarts[worker] += 1
+        self.start(worker)
+
+    def to_dict(self):
+        workers = {}
+        for worker, process in self.processes.items():
+            health = self.health.get(worker, {})
+            workers[worker] = dict(health, alive=process.is_alive(), pid=process.pid, restarts=self.restarts[worker],
+                                   failures=self.failures[worker], given_up=worker in self.given_up)
+
+        reports = [health for health in self.health.values() if health.get('ready')]
+        return {
+            'workers': workers,
+            'alive': sum(process.is_alive() for process in self.processes.values()),
+            'ready': len(reports),
+            'guilds': sum(health['guilds'] for health in reports),
+            'commands': sum(health['commands'] for health in reports),
+            'latency': max((health['latency'] for health in reports), default=0.0),
+        }
+
+    def report(self):
+        health = self.to_dict()
+        print(f'{health["alive"]}/{len(self.workers)} workers alive, {health["ready"]} ready, '
+              f'{health["guilds"]} guilds, {health["commands"]} commands, '
+              f'{health["latency"] * 1000:.0f}ms worst latency')
+
+        if self.health_file is None:
+            return
+
+        temp = f'{self.health_file}.tmp'
+        with open(temp, 'w') as f:
+            json.dump(health, f, indent=2)
+
+        os.replace(temp, self.health_file)
@@ -0,0 +1,109 @@
+__all__ = ('normalize', 'parse_level', 'NameTrie')
+
+
+_letters = str.maketrans({'α': ' alpha', 'β': ' beta', 'γ': ' gamma'})
+
+ROMAN = {'i': 1, 'ii': 2, 'iii': 3, 'iv': 4, 'v': 5, 'vi': 6, 'vii': 7}
+
+
+def normalize(name):
+    """Lowercases a name, spells out greek letters and collapses whitespace."""
+
+    return ' '.join(name.lower().translate(_letters).split())
+
+
+def parse_level(text):
+    """Returns the level of a roman or arabic numeral suffix, or None if text is neither."""
+
+    if text.isdigit():
+        return int(text)
+
+    return ROMAN.get(text)
+
+
+class NameTrie:
+    """A prefix tree over normalized names, each mapping to a value per kind.
+
+    resolve picks the name that is either the whole input or followed by a
+    level, so Attack Charm III, attack 3 and attack charm all resolve to the
+    same charm. The end of every name is also kept in a dict so resolving
+    is at most two hash lookups, the tree is walked for completions only.
+    Aliases resolve like names but are left out of completions.
+    """
+
+    def __init__(self):
+        self._root = {}
+        self._ends = {}
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def insert(self, name, kind, value, *, alias=False):
+        name = normalize(name)
+        node = self._root
+        for char in name:
+            node = node.setdefault(char, {})
+
+        # None can't be a character, so it marks the end of a name.
+        values = self._ends[name] = node.setdefault(None, {})
+        if kind not in values:
+            values[kind] = (value, alias)
+            self._size += 1
+
+    def resolve(self, text, kinds=None):
+        """Returns the kind, value and level of the name text refers to, or None.
+
+        kinds restricts the match to those kinds, the first of which is preferred
+        when a name has several. The level is None without a level suffix.
+        """
+
+        # Input is usually already clean, normalizing only on a miss saves most of the work.
+        text = text.lower()
+        resolved = self._lookup(text, kinds)
+        if resolved is None:
+            normalized = normalize(text)
+            if normalized != text:
+                resolved = self._lookup(normalized, kinds)
+
+        return resolved
+
+    def _lookup(self, text, kinds):
+        candidates = [(text, None)]
+        name, _, suffix = text.rpartition(' ')
+        level = parse_level(suffix)
+        if name and level is not None:
+            candidates.append((name, level))
+
+        for name, level in candidates:
+            values = self._ends.get(name)
+            if values is None:
+                continue
+
+            for kind in kinds or values:
+                if kind in values:
+                    return kind, values[kind][0], level
+
+        return None
+
+    def complete(self, prefix, kinds=None, *, limit=10):
+        """Returns up to limit (name, kind, value) tuples of the names starting with prefix in alphabetical order."""
+
+        node = self._root
+        for char in normalize(prefix):
+            node = node.get(char)
+            if node is None:
+                return []
+
+        results = []
+        stack = [(normalize(prefix), node)]
+        while stack and len(results) < limit:
+            name, node = stack.pop()
+            for kind, (value, alias) in node.get(None, {}).items():
+                if not alias and (kinds is None or kind in kinds):
+                    results.append((name, kind, value))
+
+            stack.extend((name + char, child) for char, child in sorted(node.items(), key=lambda item: item[0] or '',
+                                                                         reverse=True) if char is not None)
+
+        return results[:limit]
@@ -0,0 +1,38 @@
+import os
+import glob
+
+
+__all__ = ('FileWatcher',)
+
+
+class FileWatcher:
+    """Polls the modification time and size of the files matching a glob pattern.
+
+    changes compares the files against the last state passed to commit, so a
+    change that failed to be handled is reported again on the next poll.
+    """
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.state = self.scan()
+
+    def scan(self):
+        state = {}
+        for path in glob.glob(self.pattern):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            state[path] = (stat.st_mtime_ns, stat.st_size)
+
+        return state
+
+    def changes(self):
+        """Returns the new state and the paths that were added, modified or removed since the last commit."""
+
+        state = self.scan()
+        changed = {path for path in state.keys() | self.state.keys() if state.get(path) != self.state.get(path)}
+        return state, sorted(changed)
+
+    def commit(self, state):
+        self.state = state